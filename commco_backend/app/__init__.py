@@ -1,5 +1,7 @@
 from flask import Flask
 from .extensions import db, migrate, cors
+from .compression import compress_response
+from .json_provider import JSONProvider
 from . import routes, models
 from config import Config
 from .extensions import celery
@@ -9,6 +11,7 @@ import os
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = JSONProvider(app)
 
     # Initialize extensions
     db.init_app(app)
@@ -42,8 +45,23 @@ def create_app(config_class=Config):
         broker_url=app.config["CELERY_BROKER_URL"],
         result_backend=app.config["CELERY_RESULT_BACKEND"],
         broker_connection_retry_on_startup=True,  # Ensures retry on startup for Celery 6+
+        broker_transport_options={
+            "visibility_timeout": app.config["CELERY_VISIBILITY_TIMEOUT"]
+        },
         GOOGLE_CLIENT_ID=app.config["GOOGLE_CLIENT_ID"],
         GOOGLE_CLIENT_SECRET=app.config["GOOGLE_CLIENT_SECRET"],
+        # Backfills crawl whole channels, keep them off the default queue so
+        # interactive syncs never wait behind them
+        task_routes={
+            "app.backfill_channel_comments": {"queue": app.config["BACKFILL_QUEUE"]},
+        },
+        beat_schedule={
+            # Queues syncs for channels that are due, see schedule_due_syncs
+            "schedule-due-channel-syncs": {
+                "task": "app.schedule_due_syncs",
+                "schedule": 60.0,
+            },
+        },
     )
 
     class ContextTask(celery.Task):
@@ -58,5 +76,6 @@ def create_app(config_class=Config):
 
     # Register blueprints
     app.register_blueprint(routes.main_bp)
+    app.after_request(compress_response)
 
     return app
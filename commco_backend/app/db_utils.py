@@ -0,0 +1,26 @@
+"""
+Small helpers for code that has to run on both PostgreSQL and SQLite.
+"""
+
+from datetime import timezone
+
+from .extensions import db
+
+
+def dialect_insert(model):
+    """INSERT for `model` supporting ON CONFLICT clauses on the app's database."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def as_utc(value):
+    """
+    Timezone-aware copy of a datetime, naive ones being UTC (SQLite drops
+    the zone of stored values).
+    """
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,95 @@
+"""
+Near-duplicate clustering
+
+Groups comments whose normalized text is identical or whose SimHash
+fingerprints differ in only a few bits, so a spam wave of copy-pasted
+comments is classified once. Fingerprints are bucketed by band, which keeps
+the work roughly linear in the number of comments.
+"""
+
+import hashlib
+
+from .services import normalize_comment_text
+
+FINGERPRINT_BITS = 64
+# With 4 bands of 16 bits, two fingerprints within 3 bits of each other
+# always share at least one band exactly
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+# Texts shorter than this (in words) only cluster on an exact match
+MIN_SIMHASH_WORDS = 4
+
+
+def _feature_hash(feature):
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def simhash(words):
+    """64-bit SimHash over word bigrams."""
+    weights = [0] * FINGERPRINT_BITS
+    for feature in zip(words, words[1:]):
+        value = _feature_hash(" ".join(feature))
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def cluster_comments(comments, max_distance=3):
+    """
+    Group near-identical comments.
+
+    Args:
+        comments (dict): Mapping of comment ID to comment text
+        max_distance (int): Most SimHash bits two texts may differ in to be
+            clustered, 0 clusters exact (normalized) matches only
+
+    Returns:
+        list: Clusters as lists of comment IDs, in input order. The first ID of
+        each cluster is its representative.
+    """
+    clusters = []
+    by_text = {}
+    # (band index, band value) -> clusters whose representative has that band
+    buckets = {}
+    fingerprints = []
+
+    for comment_id, text in comments.items():
+        normalized = normalize_comment_text(text)
+        if normalized in by_text:
+            clusters[by_text[normalized]].append(comment_id)
+            continue
+
+        words = normalized.split()
+        match = None
+        fingerprint = None
+        if max_distance > 0 and len(words) >= MIN_SIMHASH_WORDS:
+            fingerprint = simhash(words)
+            bands = [
+                (band, fingerprint >> (band * BAND_BITS) & ((1 << BAND_BITS) - 1))
+                for band in range(BANDS)
+            ]
+            for key in bands:
+                for index in buckets.get(key, ()):
+                    if (
+                        bin(fingerprints[index] ^ fingerprint).count("1")
+                        <= max_distance
+                    ):
+                        match = index
+                        break
+                if match is not None:
+                    break
+
+        if match is None:
+            match = len(clusters)
+            clusters.append([])
+            fingerprints.append(fingerprint)
+            if fingerprint is not None:
+                for key in bands:
+                    buckets.setdefault(key, []).append(match)
+
+        clusters[match].append(comment_id)
+        by_text[normalized] = match
+
+    return clusters
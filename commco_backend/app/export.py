@@ -0,0 +1,94 @@
+"""
+Streaming comment exports
+
+An export can cover a channel's whole history, millions of rows, so it is
+never built in memory. The rows are read through a server-side cursor
+(yield_per, which implies stream_results) EXPORT_BATCH_SIZE at a time, and
+every batch is written out as one chunk of the streamed response before the
+next is fetched. Memory stays at one batch whatever the channel's size, and
+the first rows go out as soon as the database returns them.
+"""
+
+import csv
+import io
+
+from flask import current_app
+
+from .extensions import db
+from .logging_utils import error, info
+
+# Export format -> mimetype of the response
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Comment text and author names come from anyone on YouTube. Spreadsheets run
+# a cell starting with one of these as a formula, so such cells are written
+# with a leading ' (shown as text, and dropped by the spreadsheet)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _ndjson_chunk(rows):
+    dumps = current_app.json.dumps
+    return "".join(dumps(row._asdict()) + "\n" for row in rows)
+
+
+def _csv_cell(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(rows, buffer, writer):
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow(_csv_cell(value) for value in row)
+    return buffer.getvalue()
+
+
+def iter_export(query, export_format, channel_id):
+    """
+    Body of an export, in chunks of EXPORT_BATCH_SIZE rows. Must run inside
+    the request (stream_with_context), which keeps the database session open.
+
+    Args:
+        query: Ordered query of the exported columns
+        export_format (str): A key of EXPORT_FORMATS
+        channel_id (int): Channel exported, for logging
+    """
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 1000)
+    exported = 0
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(column["name"] for column in query.column_descriptions)
+        # The header goes out before the query has even run
+        yield buffer.getvalue()
+
+    try:
+        result = db.session.execute(
+            query.statement, execution_options={"yield_per": batch_size}
+        )
+        for rows in result.partitions():
+            exported += len(rows)
+            if export_format == "csv":
+                yield _csv_chunk(rows, buffer, writer)
+            else:
+                yield _ndjson_chunk(rows)
+    except Exception as e:
+        # The status line is long gone: all that is left is to break off the
+        # response, so the client sees an incomplete transfer
+        error(
+            "Comment export failed",
+            channel_id=channel_id,
+            exported=exported,
+            error=str(e),
+        )
+        raise
+
+    info("Comment export finished", channel_id=channel_id, exported=exported)
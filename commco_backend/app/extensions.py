@@ -2,6 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from celery import Celery
+from flask import current_app
+import redis
 
 
 # Extension instances (to be initialized with app in factory)
@@ -13,3 +15,16 @@ celery = Celery(
     __name__,
     include=["app.tasks"],
 )
+
+_redis = None
+
+
+def get_redis():
+    """
+    Shared Redis client (for locks, caches and pub/sub), created on first use.
+    redis-py's connection pool is fork-safe, so one client per process is fine.
+    """
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(current_app.config["REDIS_URL"])
+    return _redis
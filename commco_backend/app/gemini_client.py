@@ -0,0 +1,202 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logging_utils import warning
+
+# Status codes worth another attempt, everything else fails straight away
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The caller's deadline passed before Gemini could answer."""
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter. The refill rate halves every time Gemini
+    throttles us and creeps back up towards the configured rate on success.
+    """
+
+    def __init__(self, rate, min_rate=0.2):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drain the burst allowance so the slowdown applies immediately
+            self.tokens = min(self.tokens, 0)
+
+    def succeeded(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class GeminiClient:
+    """
+    Long-lived HTTP client for the Gemini API, one per worker process.
+    Keeps connections alive between calls, applies connect/read timeouts and
+    retries throttled or failed requests with exponential backoff and jitter.
+    """
+
+    def __init__(self, config):
+        self.timeout = (
+            config.get("GEMINI_CONNECT_TIMEOUT", 5),
+            config.get("GEMINI_READ_TIMEOUT", 60),
+        )
+        self.max_retries = config.get("GEMINI_MAX_RETRIES", 4)
+        self.backoff_base = config.get("GEMINI_BACKOFF_BASE", 0.5)
+        self.backoff_max = config.get("GEMINI_BACKOFF_MAX", 30)
+        self.bucket = TokenBucket(config.get("GEMINI_RATE_LIMIT", 10))
+
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_maxsize=max(10, config.get("GEMINI_MAX_CONCURRENCY", 4))),
+        )
+
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttles": 0,
+            "failures": 0,
+            "latency_seconds": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def stats(self):
+        """Snapshot of the request counters for this process."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["current_rate"] = round(self.bucket.rate, 2)
+        return stats
+
+    def _backoff(self, attempt, response=None):
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _remaining(self, deadline):
+        """Seconds left until `deadline` (time.monotonic()), None without one."""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Gemini request deadline passed")
+        return remaining
+
+    def post_json(self, url, api_key, payload, deadline=None):
+        """
+        POST a JSON payload, retrying retryable failures.
+        Args:
+            deadline (float): Optional time.monotonic() after which no request
+                is sent and no retry waited for, the read timeout is cut to it
+        Returns:
+            dict: The decoded JSON response
+        Raises:
+            requests.exceptions.RequestException: When all attempts failed, or
+            DeadlineExceeded once the deadline has passed
+        """
+        headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            timeout = self.timeout
+            remaining = self._remaining(deadline)
+            if remaining is not None:
+                timeout = (self.timeout[0], min(self.timeout[1], remaining))
+            self._count("requests")
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.post(
+                    url, headers=headers, json=payload, timeout=timeout
+                )
+                if response.status_code == 429:
+                    self._count("throttles")
+                    self.bucket.throttled()
+                response.raise_for_status()
+                self.bucket.succeeded()
+                return response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+            except requests.exceptions.HTTPError:
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt == self.max_retries
+                ):
+                    self._count("failures")
+                    raise
+            finally:
+                self._count("latency_seconds", time.monotonic() - started)
+
+            delay = self._backoff(attempt, response)
+            remaining = self._remaining(deadline)
+            if remaining is not None and delay >= remaining:
+                self._count("failures")
+                raise DeadlineExceeded("Gemini request deadline passed")
+            self._count("retries")
+            warning(
+                "Retrying Gemini request",
+                attempt=attempt + 1,
+                status_code=response.status_code if response is not None else None,
+                delay=f"{delay:.2f}s",
+            )
+            time.sleep(delay)
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client(config):
+    """
+    Return this process's GeminiClient, creating it on first use.
+    Celery forks its workers, so a client inherited from the parent process
+    (and its pooled sockets) is never reused in the child.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = GeminiClient(config)
+            _client_pid = os.getpid()
+        return _client
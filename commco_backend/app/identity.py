@@ -0,0 +1,86 @@
+"""
+Session-resident identity
+
+login_required used to load the User row, and most routes then lazy-loaded
+user.channels, on every request: two queries before any real work. The user's
+id, email and primary channel are now kept in the signed session cookie at
+login, so the common request runs no auth query at all. The User row is only
+loaded when a route needs more than that (tokens for a YouTube call, say).
+
+The session copy is re-checked against the database every
+SESSION_IDENTITY_TTL seconds, so a deleted user or a newly linked channel is
+picked up without logging in again.
+"""
+
+import time
+
+from flask import current_app, session
+
+from .models import db, User
+
+IDENTITY_FIELDS = ("user_id", "email", "channel_id", "youtube_channel_id")
+
+
+class SessionUser:
+    """
+    The logged-in user as routes see it in g.user. id, email, channel_id and
+    youtube_channel_id come from the session; any other attribute is read from
+    (or written to) the User row, which is loaded on first use.
+    """
+
+    def __init__(self, user_id, email, channel_id, youtube_channel_id):
+        object.__setattr__(self, "id", user_id)
+        object.__setattr__(self, "email", email)
+        object.__setattr__(self, "channel_id", channel_id)
+        object.__setattr__(self, "youtube_channel_id", youtube_channel_id)
+        object.__setattr__(self, "_row", None)
+
+    @property
+    def row(self):
+        if self._row is None:
+            object.__setattr__(self, "_row", db.session.get(User, self.id))
+        return self._row
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        return getattr(self.row, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.row, name, value)
+
+
+def remember_user(user):
+    """Store the user's identity in the session, e.g. right after login."""
+    channel = user.channels[0] if user.channels else None
+    session["user_id"] = user.id
+    session["email"] = user.email
+    session["channel_id"] = channel.id if channel else None
+    session["youtube_channel_id"] = channel.youtube_channel_id if channel else None
+    session["identity_checked_at"] = time.time()
+
+
+def load_session_user():
+    """
+    The SessionUser for this request, or None if the session has no user or
+    its user no longer exists. Sessions from before identities were stored,
+    or whose identity is older than SESSION_IDENTITY_TTL, are refreshed from
+    the database first.
+    """
+    user_id = session.get("user_id")
+    if user_id is None:
+        return None
+
+    ttl = current_app.config.get("SESSION_IDENTITY_TTL", 300)
+    checked_at = session.get("identity_checked_at", 0)
+    if any(field not in session for field in IDENTITY_FIELDS) or (
+        time.time() - checked_at > ttl
+    ):
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        remember_user(user)
+        identity = SessionUser(*(session[field] for field in IDENTITY_FIELDS))
+        object.__setattr__(identity, "_row", user)
+        return identity
+
+    return SessionUser(*(session[field] for field in IDENTITY_FIELDS))
@@ -0,0 +1,77 @@
+"""
+Versioned cache for comment listings
+
+Each channel has a data version in Redis that is bumped whenever its comments
+change (a sync or backfill saved rows, a reply was posted). Listing pages are
+cached under a key that includes the version, so a bump makes every cached
+page of the channel unreachable at once and the old entries just expire. The
+same key is the page's ETag: a client revalidating the current page gets a 304
+without the cache or the database being read.
+"""
+
+import hashlib
+import time
+
+from flask import current_app
+import redis
+
+from .extensions import get_redis
+from .logging_utils import warning
+
+VERSION_KEY = "comments-version:channel:{}"
+PAGE_KEY = "comments-page:{}"
+
+
+def get_data_version(channel_id):
+    """The channel's current data version, None if Redis is unavailable."""
+    key = VERSION_KEY.format(channel_id)
+    try:
+        client = get_redis()
+        version = client.get(key)
+        if version is None:
+            # Start from the clock rather than 0, so a lost key can never bring
+            # back pages cached under an earlier version
+            client.set(key, time.time_ns(), nx=True)
+            version = client.get(key)
+        return int(version)
+    except redis.RedisError as e:
+        warning("Failed to read data version", channel_id=channel_id, error=str(e))
+        return None
+
+
+def bump_data_version(channel_id):
+    """Mark the channel's comments as changed, invalidating its cached pages."""
+    key = VERSION_KEY.format(channel_id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.set(key, time.time_ns(), nx=True)
+        pipe.incr(key)
+        pipe.execute()
+    except redis.RedisError as e:
+        warning("Failed to bump data version", channel_id=channel_id, error=str(e))
+
+
+def listing_etag(channel_id, version, *params):
+    """ETag (and cache key) of one listing page at one data version."""
+    raw = "\x1f".join(str(part) for part in (channel_id, version, *params))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_page(etag):
+    """Serialized response body cached under etag, or None."""
+    try:
+        return get_redis().get(PAGE_KEY.format(etag))
+    except redis.RedisError as e:
+        warning("Failed to read cached page", error=str(e))
+        return None
+
+
+def cache_page(etag, body):
+    try:
+        get_redis().set(
+            PAGE_KEY.format(etag),
+            body,
+            ex=current_app.config.get("LISTING_CACHE_TTL", 600),
+        )
+    except redis.RedisError as e:
+        warning("Failed to cache page", error=str(e))
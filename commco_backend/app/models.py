@@ -1,5 +1,29 @@
 from .extensions import db
-from sqlalchemy.orm import relationship
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql.expression import ColumnElement
+
+
+class comment_search_document(ColumnElement):
+    """
+    Expression Comment.search_vector is generated from: the English tsvector of
+    the comment text on PostgreSQL. Other databases (SQLite in local runs and
+    benchmarks) have no full-text search and store NULL.
+    """
+
+    inherit_cache = True
+
+
+@compiles(comment_search_document)
+def _compile_search_document(element, compiler, **kw):
+    return "NULL"
+
+
+@compiles(comment_search_document, "postgresql")
+def _compile_search_document_postgresql(element, compiler, **kw):
+    return "to_tsvector('english', coalesce(text_original, ''))"
 
 
 class User(db.Model):
@@ -21,10 +45,34 @@ class Channel(db.Model):
     youtube_channel_id = db.Column(db.String(255), unique=True, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
+    # Publish time of the newest comment synced so far, syncs stop paging here
+    last_comment_published_at = db.Column(db.DateTime(timezone=True))
+    # Set while a sync capped by SYNC_MAX_PAGES has not yet paged down to
+    # last_comment_published_at: the page the next sync continues from, and the
+    # newest comment time seen so far, which becomes the watermark once the
+    # walk is complete
+    sync_resume_page_token = db.Column(db.String(255))
+    sync_resume_newest_at = db.Column(db.DateTime(timezone=True))
+
+    # Adaptive sync schedule: new comments per hour (smoothed) and when the
+    # scheduler should sync this channel next
+    last_synced_at = db.Column(db.DateTime(timezone=True))
+    comment_velocity = db.Column(db.Float, nullable=False, default=0.0)
+    next_sync_at = db.Column(db.DateTime(timezone=True), index=True)
+
     user = relationship("User", back_populates="channels")
     comments = relationship(
         "Comment", back_populates="channel", cascade="all, delete-orphan"
     )
+    backfill_jobs = relationship(
+        "BackfillJob", back_populates="channel", cascade="all, delete-orphan"
+    )
+    category_counts = relationship(
+        "ChannelCategoryCount", back_populates="channel", cascade="all, delete-orphan"
+    )
+    video_category_counts = relationship(
+        "VideoCategoryCount", back_populates="channel", cascade="all, delete-orphan"
+    )
 
 
 class Comment(db.Model):
@@ -43,5 +91,135 @@ class Comment(db.Model):
     category = db.Column(
         db.String(50), index=True, nullable=False, default="Miscellaneous"
     )
+    # Set when Gemini failed or ran out of time and the comment was saved with
+    # the default category. The watermark has moved past it, so later syncs
+    # pick these up separately (see reclassify_pending_comments).
+    needs_classification = db.Column(
+        db.Boolean, nullable=False, default=False, server_default="0"
+    )
+
+    # Full-text search document, kept up to date by the database itself.
+    # Deferred: only search queries need it.
+    search_vector = deferred(
+        db.Column(
+            TSVECTOR().with_variant(db.Text(), "sqlite"),
+            db.Computed(comment_search_document(), persisted=True),
+        )
+    )
 
     channel = relationship("Channel", back_populates="comments")
+
+    # Listing indexes, newest first: keyset pagination (see pagination.py)
+    # reads any page of a channel, with or without a category, as one range scan
+    __table_args__ = (
+        db.Index(
+            "ix_comments_channel_category_published",
+            "channel_id",
+            "category",
+            published_at.desc(),
+            "id",
+        ),
+        db.Index(
+            "ix_comments_channel_published", "channel_id", published_at.desc(), "id"
+        ),
+        db.Index(
+            "ix_comments_channel_video_published",
+            "channel_id",
+            "video_id",
+            published_at.desc(),
+            "id",
+        ),
+        db.Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+        # Only the few comments still waiting for a classification
+        db.Index(
+            "ix_comments_needs_classification",
+            "channel_id",
+            postgresql_where=needs_classification,
+            sqlite_where=needs_classification,
+        ),
+    )
+
+
+class ChannelCategoryCount(db.Model):
+    """
+    Number of a channel's comments in one category. Kept in step by
+    upsert_comments in the same transaction as the comments it saves, so
+    dashboards never have to COUNT(*) the comments table.
+    """
+
+    __tablename__ = "channel_category_counts"
+    channel_id = db.Column(db.Integer, db.ForeignKey("channels.id"), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    channel = relationship("Channel", back_populates="category_counts")
+
+
+class VideoCategoryCount(db.Model):
+    """
+    Number of comments on one video of a channel in one category, and the
+    publish time of the newest of them. Maintained by upsert_comments like
+    ChannelCategoryCount, so per-video summaries never GROUP BY the comments.
+
+    When an edit moves a comment to another category, latest_published_at of
+    the category it left is not wound back: only the newest time over all of a
+    video's rows, which is exact, is meant to be read.
+    """
+
+    __tablename__ = "video_category_counts"
+    channel_id = db.Column(db.Integer, db.ForeignKey("channels.id"), primary_key=True)
+    video_id = db.Column(db.String(255), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    latest_published_at = db.Column(db.DateTime(timezone=True))
+
+    channel = relationship("Channel", back_populates="video_category_counts")
+
+
+class BackfillJob(db.Model):
+    """
+    Full-history crawl of a channel's comment threads. The page token and
+    counts are checkpointed after every page so the job resumes where it
+    stopped after a worker restart.
+    """
+
+    __tablename__ = "backfill_jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(
+        db.Integer, db.ForeignKey("channels.id"), nullable=False, index=True
+    )
+    # pending, running, completed or failed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    # Run of backfill_channel_comments working on the job, updated_at is its
+    # heartbeat
+    owner = db.Column(db.String(36))
+    # Next commentThreads page to fetch, None before the first page
+    next_page_token = db.Column(db.String(255))
+    pages_done = db.Column(db.Integer, nullable=False, default=0)
+    comments_processed = db.Column(db.Integer, nullable=False, default=0)
+    comments_added = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+    finished_at = db.Column(db.DateTime(timezone=True))
+
+    channel = relationship("Channel", back_populates="backfill_jobs")
+
+
+class ClassificationCacheEntry(db.Model):
+    """Category Gemini gave for a piece of comment text under one prompt/model."""
+
+    __tablename__ = "classification_cache"
+    # sha256 of prompt version, model and normalized comment text
+    content_hash = db.Column(db.String(64), primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination for comment listings and searches.
+
+Listing pages are ordered newest first by (published_at DESC, id) and the
+cursor is the sort key of the last comment on a page, so fetching any page is
+one index range scan of `limit` rows, however deep it is. Search pages are
+ordered by rank first, and their cursors carry the rank as well. Cursors are
+opaque to clients: URL-safe base64 of a small JSON array.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from .models import Comment
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this module."""
+
+
+def _encode(values):
+    raw = json.dumps(values)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(comment):
+    """Cursor pointing just past `comment` in listing order."""
+    return _encode([comment.published_at.isoformat(), comment.id])
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (published_at, id) of the last comment on the previous page
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        published_at, comment_id = _decode(cursor)
+        return datetime.fromisoformat(published_at), int(comment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def _after_comment(published_at, comment_id):
+    """Rows after (published_at, id) in (published_at DESC, id) order."""
+    return or_(
+        Comment.published_at < published_at,
+        and_(Comment.published_at == published_at, Comment.id > comment_id),
+    )
+
+
+def paginate_comments(query, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of a comments query.
+
+    Args:
+        query: Query of Comment entities or of Comment columns (including
+            published_at and id), with the listing's filters applied, unordered
+        cursor (str): next_cursor of the previous page, None for the first page
+        limit (int): Comments per page
+
+    Returns:
+        tuple: (comments on the page, next_cursor or None on the last page)
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        published_at, comment_id = decode_cursor(cursor)
+        # The redundant `<=` bound is what the index range scan starts from;
+        # the OR alone would be applied as a filter after scanning from the top
+        query = query.filter(
+            Comment.published_at <= published_at,
+            _after_comment(published_at, comment_id),
+        )
+
+    # One extra row tells whether another page follows without a COUNT
+    comments = (
+        query.order_by(Comment.published_at.desc(), Comment.id).limit(limit + 1).all()
+    )
+    if len(comments) > limit:
+        comments = comments[:limit]
+        return comments, encode_cursor(comments[-1])
+    return comments, None
+
+
+def paginate_search(query, rank, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of search results, best `rank` first and newest first
+    among equal ranks. The cursor carries the rank of the last result too.
+
+    Args:
+        query: Query of Comment columns (including published_at and id), with
+            the search and its filters applied, unordered
+        rank: SQL expression scoring each comment against the search
+        cursor (str): next_cursor of the previous page, None for the first page
+        limit (int): Results per page
+
+    Returns:
+        tuple: (rows on the page, each with the query's columns and `rank`,
+        next_cursor or None)
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        try:
+            last_rank, published_at, comment_id = _decode(cursor)
+            last_rank = float(last_rank)
+            published_at = datetime.fromisoformat(published_at)
+            comment_id = int(comment_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+            raise InvalidCursor(str(e)) from e
+        query = query.filter(
+            rank <= last_rank,
+            or_(
+                rank < last_rank,
+                and_(rank == last_rank, _after_comment(published_at, comment_id)),
+            ),
+        )
+
+    results = (
+        query.add_columns(rank.label("rank"))
+        .order_by(rank.desc(), Comment.published_at.desc(), Comment.id)
+        .limit(limit + 1)
+        .all()
+    )
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = _encode([last.rank, last.published_at.isoformat(), last.id])
+        return results, next_cursor
+    return results, None
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Parse a `limit` query parameter, clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        return max(1, min(MAX_PAGE_SIZE, int(value)))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,109 @@
+"""
+Local pre-classification
+
+Cheap rules that recognise obvious comments (link spam, emoji-only praise,
+short one-line questions) before anything is sent to Gemini. Every rule
+returns a category with a confidence, and only answers at or above the
+configured threshold are used; everything else goes on to the LLM.
+"""
+
+import re
+
+URL_RE = re.compile(r"(https?://|www\.)\S+", re.IGNORECASE)
+# Self-promotion that is junk on its own
+PROMO_PHRASES = (
+    "check out my channel",
+    "check my channel",
+    "subscribe to my",
+    "sub to my",
+    "visit my channel",
+)
+# Scam bait, only conclusive together with a link
+SCAM_WORDS = ("whatsapp", "telegram", "crypto", "bitcoin", "investment", "dm me")
+# Emoji that only ever mean praise. Anything else (thumbs down, vomiting face,
+# pile of poo, frowns, but also plain symbols like (c) or a degree sign) makes
+# the comment go to the model.
+FAN_EMOJI = set(
+    "❤❣🧡💛💚💙💜🤎🖤🤍💖💗💓💞💕💘💝💌😍🥰"
+    "😘😻🤩😊☺😁😀😃😄😆👍👏🙌🙏💯🔥⭐🌟✨🏆"
+    "🥇🎉🎊👌🤘💪🫶😎🥳🚀👑💐🌹"
+)
+# Requests and complaints phrased as questions ("can you do a video on X?",
+# "why is the audio so bad?") are Ideas or Criticisms, not questions to answer
+SUGGESTION_RE = re.compile(
+    r"^(can|could|would|will|pls|please)\s+(you|u)\b"
+    r"|\b(how|what)\s+about\b"
+    r"|\bwhy\s+(don'?t|not|didn'?t|can'?t|won'?t)\s+you\b"
+    r"|\b(you\s+should|next\s+video|make\s+a\s+video|do\s+a\s+video)\b",
+    re.IGNORECASE,
+)
+NEGATIVE_RE = re.compile(
+    r"\b(bad|worse|worst|terrible|awful|horrible|boring|annoying|hate|trash"
+    r"|garbage|cringe|clickbait|misleading|wrong|broken|stop|quiet|loud"
+    r"|unsubscrib\w*|disappoint\w*|ruin\w*|waste)\b",
+    re.IGNORECASE,
+)
+# Zero width joiner and variation selectors that glue emoji sequences together,
+# and the skin tone modifiers U+1F3FB..U+1F3FF
+EMOJI_EXTRA = {"\u200d", "\ufe0f", "\ufe0e"} | {
+    chr(code) for code in range(0x1F3FB, 0x1F400)
+}
+
+
+def _is_fan_emoji_only(text):
+    chars = [c for c in text if not c.isspace()]
+    return any(c in FAN_EMOJI for c in chars) and all(
+        c in FAN_EMOJI or c in EMOJI_EXTRA for c in chars
+    )
+
+
+def link_spam_rule(text):
+    lowered = text.lower()
+    has_link = URL_RE.search(text) is not None
+    if any(phrase in lowered for phrase in PROMO_PHRASES):
+        return "Delete Junk", 0.97 if has_link else 0.9
+    if has_link and any(word in lowered for word in SCAM_WORDS):
+        return "Delete Junk", 0.95
+    if has_link and len(URL_RE.sub("", text).strip()) < 20:
+        # Little more than a bare link
+        return "Delete Junk", 0.9
+    if any(word in lowered for word in SCAM_WORDS):
+        return "Delete Junk", 0.6
+    return None
+
+
+def emoji_only_rule(text):
+    if _is_fan_emoji_only(text):
+        return "Appreciate Fan", 0.9
+    return None
+
+
+def short_question_rule(text):
+    stripped = text.strip()
+    if "\n" in stripped or len(stripped) > 150 or not stripped.endswith("?"):
+        return None
+    if SUGGESTION_RE.search(stripped) or NEGATIVE_RE.search(stripped):
+        return None
+    return "Reply to Question", 0.85
+
+
+DEFAULT_RULES = (link_spam_rule, emoji_only_rule, short_question_rule)
+
+
+class RuleBasedClassifier:
+    """Runs the local rules in order and keeps the first confident answer."""
+
+    def __init__(self, min_confidence=0.85, rules=DEFAULT_RULES):
+        self.min_confidence = min_confidence
+        self.rules = rules
+
+    def classify(self, comment_text):
+        """
+        Returns:
+            str: The category, or None when no rule is confident enough
+        """
+        for rule in self.rules:
+            result = rule(comment_text)
+            if result and result[1] >= self.min_confidence:
+                return result[0]
+        return None
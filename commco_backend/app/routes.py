@@ -2,6 +2,7 @@ import os
 import functools
 from flask import (
     Blueprint,
+    Response,
     jsonify,
     request,
     redirect,
@@ -9,10 +10,39 @@ from flask import (
     session,
     current_app,
     g,
+    stream_with_context,
 )
-from .models import db, User, Channel, Comment
-from .services import encrypt_data, YouTubeService
-from .tasks import process_channel_comments
+from .models import (
+    db,
+    User,
+    Channel,
+    Comment,
+    BackfillJob,
+    ChannelCategoryCount,
+    VideoCategoryCount,
+)
+from .services import (
+    CATEGORIES,
+    encrypt_data,
+    YouTubeService,
+    get_user_credentials,
+    invalidate_user_credentials,
+)
+from .tasks import enqueue_channel_sync, start_channel_backfill
+from .identity import load_session_user, remember_user
+from .export import EXPORT_FORMATS, iter_export
+from .db_utils import as_utc
+from .sync_status import get_sync_job, iter_sync_events
+from .pagination import InvalidCursor, page_size, paginate_comments, paginate_search
+from .listing_cache import (
+    bump_data_version,
+    cache_page,
+    get_cached_page,
+    get_data_version,
+    listing_etag,
+)
+from sqlalchemy import cast, func, select
+from dateutil.parser import isoparse
 import google_auth_oauthlib.flow
 from google.oauth2 import credentials
 import requests
@@ -39,12 +69,16 @@ os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 # Define the Blueprint for our API routes
 main_bp = Blueprint("main", __name__, url_prefix="/api")
 
+# Longest search query accepted by /comments/search
+MAX_SEARCH_QUERY_LENGTH = 200
+
 
 # --- Decorator for Protecting Routes ---
 def login_required(f):
     """
     Ensures a user is logged in before allowing access to a route.
-    Also loads the user object into Flask's global 'g' object.
+    Also puts the user into Flask's global 'g' object, as a SessionUser whose
+    id, email and channel come from the session without a query.
     """
 
     @functools.wraps(f)
@@ -53,8 +87,8 @@ def login_required(f):
         if user_id is None:
             return jsonify({"error": "Unauthorized. Please log in."}), 401
 
-        # Load the user object for the current request
-        g.user = User.query.get(user_id)
+        # Identity for the current request, see identity.py
+        g.user = load_session_user()
         if g.user is None:
             # This case can happen if user was deleted but session persists
             session.clear()
@@ -174,6 +208,7 @@ def google_callback():
         user.access_token_encrypted = encrypted_access_token
         if encrypted_refresh_token:
             user.refresh_token_encrypted = encrypted_refresh_token
+        invalidate_user_credentials(user.id)
     else:
         # New user: create a new record
         info("Creating new user", google_id=google_id, email=user_info["email"])
@@ -219,9 +254,9 @@ def google_callback():
         db.session.rollback()
         raise
 
-    # Log the user in by storing their DB id in the session
+    # Log the user in by storing their DB id and channel in the session
     session.clear()
-    session["user_id"] = user.id
+    remember_user(user)
 
     log_auth_event("login_successful", user_email=user.email, user_id=user.id)
 
@@ -260,9 +295,7 @@ def get_current_user():
     response_data = {
         "id": g.user.id,
         "email": g.user.email,
-        "channel_id": (
-            g.user.channels[0].youtube_channel_id if g.user.channels else None
-        ),
+        "channel_id": g.user.youtube_channel_id,
     }
     return jsonify(response_data)
 
@@ -274,54 +307,274 @@ def sync_channel():
     """
     Triggers a background job to fetch and classify the latest comments for the user's channel.
     """
-    if not g.user.channels:
+    if g.user.channel_id is None:
         warning("Channel sync requested but no channel found", user_id=g.user.id)
         return jsonify({"error": "No YouTube channel linked to this account."}), 404
 
-    channel = g.user.channels[0]
+    channel_id = g.user.channel_id
     info(
         "Starting channel sync",
         user_id=g.user.id,
-        channel_id=channel.id,
-        youtube_channel_id=channel.youtube_channel_id,
+        channel_id=channel_id,
+        youtube_channel_id=g.user.youtube_channel_id,
     )
 
     try:
-        process_channel_comments.delay(channel.id)
+        task_id, is_new = enqueue_channel_sync(channel_id)
+        if not is_new:
+            info(
+                "Channel sync already in progress",
+                user_id=g.user.id,
+                channel_id=channel_id,
+                task_id=task_id,
+            )
+            return (
+                jsonify(
+                    {"message": "Channel sync is already running.", "job_id": task_id}
+                ),
+                202,
+            )
+
         info(
             "Channel sync task queued successfully",
             user_id=g.user.id,
-            channel_id=channel.id,
+            channel_id=channel_id,
+            task_id=task_id,
+        )
+        return (
+            jsonify({"message": "Channel sync has been started.", "job_id": task_id}),
+            202,
         )
-        return jsonify({"message": "Channel sync has been started."}), 202
     except Exception as e:
         error(
             "Failed to queue channel sync task",
             user_id=g.user.id,
-            channel_id=channel.id,
+            channel_id=channel_id,
             error=str(e),
         )
         return jsonify({"error": "Failed to start channel sync."}), 500
 
 
+@main_bp.route("/channel/sync/<job_id>")
+@login_required
+@log_request
+def get_sync_status(job_id):
+    """
+    Returns the status and progress counts of a channel sync job.
+    """
+    if g.user.channel_id is None:
+        warning("Sync status requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    try:
+        job = get_sync_job(job_id)
+    except Exception as e:
+        error("Failed to read sync status", job_id=job_id, error=str(e))
+        return jsonify({"error": "Failed to read sync status."}), 500
+
+    # Jobs of other users' channels are reported as missing, not forbidden
+    if job is None or job["channel_id"] != g.user.channel_id:
+        return jsonify({"error": "Sync job not found."}), 404
+    return jsonify(job)
+
+
+@main_bp.route("/channel/sync/events")
+@login_required
+def sync_events():
+    """
+    Server-Sent Events stream announcing when the sync job given by the
+    `job_id` query parameter completes (with its new comment count), fails or
+    is skipped, so the dashboard can refetch exactly once. Each connection
+    holds a worker, so the stream ends with the job or after
+    SYNC_EVENTS_MAX_SECONDS.
+    """
+    if g.user.channel_id is None:
+        warning("Sync events requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    job_id = request.args.get("job_id")
+    if not job_id:
+        return jsonify({"error": "job_id is required."}), 400
+    try:
+        job = get_sync_job(job_id)
+    except Exception as e:
+        error("Failed to read sync status", job_id=job_id, error=str(e))
+        return jsonify({"error": "Failed to read sync status."}), 500
+    if job is None or job["channel_id"] != g.user.channel_id:
+        return jsonify({"error": "Sync job not found."}), 404
+
+    debug("Opening sync event stream", user_id=g.user.id, job_id=job_id)
+    # The stream runs inside the request context (it needs the app config to
+    # reach Redis) for as long as the client listens, so give back any
+    # database connection the request holds first
+    db.session.close()
+    return Response(
+        stream_with_context(
+            iter_sync_events(
+                g.user.channel_id,
+                job_id,
+                max_lifetime=current_app.config.get("SYNC_EVENTS_MAX_SECONDS", 300),
+            )
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _backfill_job_json(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "pages_done": job.pages_done,
+        "comments_processed": job.comments_processed,
+        "comments_added": job.comments_added,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+@main_bp.route("/channel/backfill", methods=["POST"])
+@login_required
+@log_request
+def backfill_channel():
+    """
+    Starts (or resumes) a background crawl of the channel's entire comment history.
+    """
+    if g.user.channel_id is None:
+        warning("Channel backfill requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    channel_id = g.user.channel_id
+    try:
+        job = start_channel_backfill(channel_id)
+        info(
+            "Channel backfill queued",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            job_id=job.id,
+            status=job.status,
+        )
+        return jsonify(_backfill_job_json(job)), 202
+    except Exception as e:
+        db.session.rollback()
+        error(
+            "Failed to queue channel backfill",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            error=str(e),
+        )
+        return jsonify({"error": "Failed to start channel backfill."}), 500
+
+
+@main_bp.route("/channel/backfill")
+@login_required
+@log_request
+def get_backfill_progress():
+    """
+    Returns the progress of the channel's most recent backfill.
+    """
+    if g.user.channel_id is None:
+        warning("Backfill progress requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    job = (
+        BackfillJob.query.filter_by(channel_id=g.user.channel_id)
+        .order_by(BackfillJob.id.desc())
+        .first()
+    )
+    if job is None:
+        return jsonify({"error": "No backfill has been started for this channel."}), 404
+    return jsonify(_backfill_job_json(job))
+
+
+def _listing_response(body=None, status=200, etag=None):
+    """JSON listing response that browsers must revalidate with its ETag."""
+    response = Response(body, status=status, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _cached_listing(channel_id, *params):
+    """
+    Look up a listing in the versioned cache (see listing_cache.py).
+    Listings only change when a sync, backfill or reply lands, so an unchanged
+    one costs no query at all.
+    Returns:
+        tuple: (ETag for the listing or None without Redis or with
+        LISTING_CACHE_ENABLED off, response to send straight away when the
+        client or the cache already has it, else None)
+    """
+    if not current_app.config.get("LISTING_CACHE_ENABLED", True):
+        return None, None
+    version = get_data_version(channel_id)
+    if version is None:
+        return None, None
+    etag = listing_etag(channel_id, version, *params)
+    # Weak comparison: gzipped responses carry the ETag as a weak one
+    if request.if_none_match.contains_weak(etag):
+        return etag, _listing_response(status=304, etag=etag)
+    body = get_cached_page(etag)
+    if body is not None:
+        debug("Listing served from cache", channel_id=channel_id)
+        return etag, _listing_response(body, etag=etag)
+    return etag, None
+
+
+def _fresh_listing(payload, etag):
+    """Serialize a freshly queried listing, caching it under its ETag."""
+    response = jsonify(payload)
+    if etag is None:
+        return response
+    cache_page(etag, response.get_data())
+    return _listing_response(response.get_data(), etag=etag)
+
+
+# The columns a listing returns. Listings select just these, as plain rows:
+# no Comment entities to build and track, and no deferred/unused columns read.
+LISTING_COLUMNS = (
+    Comment.id,
+    Comment.youtube_comment_id,
+    Comment.text_original,
+    Comment.author_name,
+    Comment.author_avatar_url,
+    Comment.video_id,
+    Comment.published_at,
+    Comment.category,
+)
+
+
+def _comment_json(row):
+    # The JSON provider writes published_at as ISO 8601 itself
+    return row._asdict()
+
+
+def _category_query(channel_id, category):
+    query = db.session.query(*LISTING_COLUMNS).filter(Comment.channel_id == channel_id)
+    # Handle "All" category by not filtering by category
+    if category == "All":
+        return query
+    return query.filter(Comment.category == category)
+
+
 @main_bp.route("/comments")
 @login_required
 @log_request
 def get_comments():
     """
-    Fetches categorized comments from the database for the user's channel.
-    Accepts a 'category' query parameter to filter results.
-    """
-    valid_categories = [
-        "Reply to Question",
-        "Appreciate Fan",
-        "Ideas",
-        "Criticisms",
-        "Delete Junk",
-        "Miscellaneous",
-        "All",
-    ]
+    Fetches one page of categorized comments for the user's channel, newest first.
+    Accepts 'category', 'video_id', 'limit' (at most 100) and 'cursor' query
+    parameters; pass the response's 'next_cursor' as 'cursor' to get the
+    following page.
+    """
+    valid_categories = CATEGORIES + ["All"]
     category_filter = request.args.get("category", "All")
+    video_id = request.args.get("video_id")
+    cursor = request.args.get("cursor")
+    limit = page_size(request.args.get("limit"))
 
     debug("Fetching comments", user_id=g.user.id, category=category_filter)
 
@@ -337,63 +590,422 @@ def get_comments():
             400,
         )
 
-    if not g.user.channels:
+    if g.user.channel_id is None:
         warning("Comments requested but no channel found", user_id=g.user.id)
         return jsonify({"error": "No YouTube channel linked to this account."}), 404
 
-    channel = g.user.channels[0]
+    channel_id = g.user.channel_id
+
+    etag, cached = _cached_listing(channel_id, category_filter, video_id, limit, cursor)
+    if cached is not None:
+        return cached
 
     try:
-        # Handle "All" category by not filtering by category
-        if category_filter == "All":
-            comments = (
-                Comment.query.filter_by(channel_id=channel.id)
-                .order_by(Comment.published_at.desc())
-                .limit(100)
-                .all()
-            )
-        else:
-            comments = (
-                Comment.query.filter_by(channel_id=channel.id, category=category_filter)
-                .order_by(Comment.published_at.desc())
-                .limit(100)
-                .all()
-            )
-        result = [
-            {
-                "id": c.id,
-                "youtube_comment_id": c.youtube_comment_id,
-                "text_original": c.text_original,
-                "author_name": c.author_name,
-                "author_avatar_url": c.author_avatar_url,
-                "video_id": c.video_id,
-                "published_at": c.published_at.isoformat(),
-                "category": c.category,
-            }
-            for c in comments
-        ]
+        # A video's comments are read through ix_comments_channel_video_published
+        comments, next_cursor = paginate_comments(
+            _filter_comments(_category_query(channel_id, category_filter), video_id),
+            cursor,
+            limit,
+        )
+        result = [_comment_json(c) for c in comments]
 
         info(
             "Comments fetched successfully",
             user_id=g.user.id,
-            channel_id=channel.id,
+            channel_id=channel_id,
             category=category_filter,
+            video_id=video_id,
             count=len(result),
         )
 
-        return jsonify(result)
+        return _fresh_listing({"comments": result, "next_cursor": next_cursor}, etag)
+
+    except InvalidCursor as e:
+        warning("Invalid comments cursor", user_id=g.user.id, error=str(e))
+        return jsonify({"error": "Invalid cursor."}), 400
 
     except Exception as e:
         error(
             "Failed to fetch comments",
             user_id=g.user.id,
-            channel_id=channel.id,
+            channel_id=channel_id,
             category=category_filter,
             error=str(e),
         )
         return jsonify({"error": "Failed to fetch comments."}), 500
 
 
+@main_bp.route("/dashboard")
+@login_required
+@log_request
+def get_dashboard():
+    """
+    Everything the comments page needs for its first paint in one response:
+    the number of comments in each category and the first page of each
+    category (and of "All"). Accepts a 'limit' query parameter per page.
+    """
+    if g.user.channel_id is None:
+        warning("Dashboard requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    channel_id = g.user.channel_id
+    limit = page_size(request.args.get("limit"))
+
+    etag, cached = _cached_listing(channel_id, "dashboard", limit)
+    if cached is not None:
+        return cached
+
+    try:
+        # Counts come from the aggregate ingestion maintains, not COUNT(*)
+        counts = {category: 0 for category in CATEGORIES}
+        for category, count in db.session.execute(
+            select(ChannelCategoryCount.category, ChannelCategoryCount.count).where(
+                ChannelCategoryCount.channel_id == channel_id
+            )
+        ):
+            counts[category] = count
+        counts["All"] = sum(counts.values())
+
+        pages = {}
+        for category in CATEGORIES + ["All"]:
+            if counts[category] == 0:
+                pages[category] = {"comments": [], "next_cursor": None}
+                continue
+            comments, next_cursor = paginate_comments(
+                _category_query(channel_id, category), limit=limit
+            )
+            pages[category] = {
+                "comments": [_comment_json(c) for c in comments],
+                "next_cursor": next_cursor,
+            }
+
+        info(
+            "Dashboard fetched successfully",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            total=counts["All"],
+        )
+
+        return _fresh_listing({"counts": counts, "pages": pages}, etag)
+
+    except Exception as e:
+        error(
+            "Failed to fetch dashboard",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            error=str(e),
+        )
+        return jsonify({"error": "Failed to fetch dashboard."}), 500
+
+
+def _video_summaries(channel_id, video_id=None):
+    """
+    Comment counts per category and newest comment time of the channel's
+    videos (or of one), most recently commented first. Read from the
+    aggregate ingestion maintains: at most one row per video and category.
+    """
+    query = select(
+        VideoCategoryCount.video_id,
+        VideoCategoryCount.category,
+        VideoCategoryCount.count,
+        VideoCategoryCount.latest_published_at,
+    ).where(VideoCategoryCount.channel_id == channel_id)
+    if video_id is not None:
+        query = query.where(VideoCategoryCount.video_id == video_id)
+
+    summaries = {}
+    for row_video_id, category, count, latest in db.session.execute(query):
+        summary = summaries.setdefault(
+            row_video_id,
+            {
+                "video_id": row_video_id,
+                "counts": {category: 0 for category in CATEGORIES},
+                "latest_comment_at": None,
+            },
+        )
+        summary["counts"][category] = count
+        if latest is not None and (
+            summary["latest_comment_at"] is None
+            or latest > summary["latest_comment_at"]
+        ):
+            summary["latest_comment_at"] = latest
+
+    for summary in summaries.values():
+        summary["counts"]["All"] = sum(summary["counts"].values())
+    return sorted(
+        summaries.values(),
+        key=lambda summary: (
+            summary["latest_comment_at"] is not None,
+            summary["latest_comment_at"] or 0,
+        ),
+        reverse=True,
+    )
+
+
+@main_bp.route("/videos")
+@login_required
+@log_request
+def get_videos():
+    """
+    Every video of the user's channel that has comments, most recently
+    commented first, with its comment counts per category and the publish
+    time of its newest comment.
+    """
+    if g.user.channel_id is None:
+        warning("Videos requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    channel_id = g.user.channel_id
+    etag, cached = _cached_listing(channel_id, "videos")
+    if cached is not None:
+        return cached
+
+    try:
+        videos = _video_summaries(channel_id)
+        info(
+            "Videos fetched successfully",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            count=len(videos),
+        )
+        return _fresh_listing({"videos": videos}, etag)
+
+    except Exception as e:
+        error(
+            "Failed to fetch videos",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            error=str(e),
+        )
+        return jsonify({"error": "Failed to fetch videos."}), 500
+
+
+@main_bp.route("/videos/<video_id>")
+@login_required
+@log_request
+def get_video_summary(video_id):
+    """
+    Comment counts per category and the publish time of the newest comment
+    of one video of the user's channel. List its comments with
+    /comments?video_id=...
+    """
+    if g.user.channel_id is None:
+        warning("Video summary requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    channel_id = g.user.channel_id
+    etag, cached = _cached_listing(channel_id, "video", video_id)
+    if cached is not None:
+        return cached
+
+    try:
+        summaries = _video_summaries(channel_id, video_id)
+        if not summaries:
+            return jsonify({"error": "No comments found for this video."}), 404
+        return _fresh_listing(summaries[0], etag)
+
+    except Exception as e:
+        error(
+            "Failed to fetch video summary",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            video_id=video_id,
+            error=str(e),
+        )
+        return jsonify({"error": "Failed to fetch video summary."}), 500
+
+
+@main_bp.route("/comments/search")
+@login_required
+@log_request
+def search_comments():
+    """
+    Full-text search over the user's channel's comments, best matches first.
+    Accepts 'q' (web search syntax: quoted phrases, OR, -word), optional
+    'category', 'video_id', 'published_after' and 'published_before' filters,
+    and 'limit'/'cursor' pagination like /comments.
+    """
+    query_text = request.args.get("q", "").strip()
+    category_filter = request.args.get("category", "All")
+    video_id = request.args.get("video_id")
+    cursor = request.args.get("cursor")
+    limit = page_size(request.args.get("limit"))
+
+    if not query_text:
+        return jsonify({"error": "Missing search query 'q'."}), 400
+    if len(query_text) > MAX_SEARCH_QUERY_LENGTH:
+        return (
+            jsonify(
+                {
+                    "error": f"Search query is limited to {MAX_SEARCH_QUERY_LENGTH} characters."
+                }
+            ),
+            400,
+        )
+    if category_filter not in CATEGORIES + ["All"]:
+        return jsonify({"error": f"Invalid category: {category_filter}"}), 400
+    try:
+        published_after = _date_arg("published_after")
+        published_before = _date_arg("published_before")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if g.user.channel_id is None:
+        warning("Search requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    if db.session.get_bind().dialect.name != "postgresql":
+        return jsonify({"error": "Search requires PostgreSQL."}), 501
+
+    channel_id = g.user.channel_id
+    debug("Searching comments", user_id=g.user.id, channel_id=channel_id)
+
+    etag, cached = _cached_listing(
+        channel_id,
+        "search",
+        query_text,
+        category_filter,
+        video_id,
+        published_after,
+        published_before,
+        limit,
+        cursor,
+    )
+    if cached is not None:
+        return cached
+
+    try:
+        # Matched through the GIN index on the generated search_vector column
+        tsquery = func.websearch_to_tsquery("english", query_text)
+        query = _filter_comments(
+            _category_query(channel_id, category_filter),
+            video_id,
+            published_after,
+            published_before,
+        ).filter(Comment.search_vector.op("@@")(tsquery))
+
+        # ts_rank_cd returns a real; as double precision the rank survives the
+        # round trip through Python and the cursor exactly
+        rank = cast(func.ts_rank_cd(Comment.search_vector, tsquery), db.Float)
+        results, next_cursor = paginate_search(query, rank, cursor, limit)
+
+        info(
+            "Comments searched successfully",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            count=len(results),
+        )
+
+        return _fresh_listing(
+            {
+                "comments": [
+                    {**_comment_json(row), "rank": round(row.rank, 6)}
+                    for row in results
+                ],
+                "next_cursor": next_cursor,
+            },
+            etag,
+        )
+
+    except InvalidCursor as e:
+        warning("Invalid search cursor", user_id=g.user.id, error=str(e))
+        return jsonify({"error": "Invalid cursor."}), 400
+
+    except Exception as e:
+        error(
+            "Failed to search comments",
+            user_id=g.user.id,
+            channel_id=channel_id,
+            error=str(e),
+        )
+        return jsonify({"error": "Failed to search comments."}), 500
+
+
+def _filter_comments(query, video_id=None, published_after=None, published_before=None):
+    """Apply the optional video and publish time filters of search and export."""
+    if video_id:
+        query = query.filter(Comment.video_id == video_id)
+    if published_after:
+        query = query.filter(Comment.published_at >= published_after)
+    if published_before:
+        query = query.filter(Comment.published_at < published_before)
+    return query
+
+
+@main_bp.route("/comments/export")
+@login_required
+@log_request
+def export_comments():
+    """
+    Streams every comment of the user's channel matching the filters, newest
+    first, as NDJSON (one JSON object per line, the default) or CSV, chosen by
+    'format'. Accepts the 'category', 'video_id', 'published_after' and
+    'published_before' filters of /comments/search.
+    """
+    export_format = request.args.get("format", "ndjson")
+    category_filter = request.args.get("category", "All")
+    video_id = request.args.get("video_id")
+
+    if export_format not in EXPORT_FORMATS:
+        return (
+            jsonify(
+                {"error": f"Invalid format. Must be one of {list(EXPORT_FORMATS)}"}
+            ),
+            400,
+        )
+    if category_filter not in CATEGORIES + ["All"]:
+        return jsonify({"error": f"Invalid category: {category_filter}"}), 400
+    try:
+        published_after = _date_arg("published_after")
+        published_before = _date_arg("published_before")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if g.user.channel_id is None:
+        warning("Export requested but no channel found", user_id=g.user.id)
+        return jsonify({"error": "No YouTube channel linked to this account."}), 404
+
+    channel_id = g.user.channel_id
+    info(
+        "Exporting comments",
+        user_id=g.user.id,
+        channel_id=channel_id,
+        format=export_format,
+        category=category_filter,
+    )
+
+    query = _filter_comments(
+        _category_query(channel_id, category_filter),
+        video_id,
+        published_after,
+        published_before,
+    ).order_by(Comment.published_at.desc(), Comment.id)
+
+    filename = f"comments-{g.user.youtube_channel_id}.{export_format}"
+    return Response(
+        stream_with_context(iter_export(query, export_format, channel_id)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            # Keep proxies from buffering the whole export before sending it
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _date_arg(name):
+    """Parse an optional ISO 8601 date/time query parameter (UTC if no zone)."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = isoparse(value)
+    except ValueError:
+        raise ValueError(f"Invalid date for '{name}', use ISO 8601.")
+    return as_utc(parsed)
+
+
 @main_bp.route("/comments/<int:comment_id>/reply", methods=["POST"])
 @login_required
 @log_request
@@ -417,31 +1029,29 @@ def reply_to_comment(comment_id):
         return jsonify({"error": "Reply text cannot be empty."}), 400
 
     # Check if user has a channel
-    if not g.user.channels:
+    if g.user.channel_id is None:
         warning("Reply requested but no channel found", user_id=g.user.id)
         return jsonify({"error": "No YouTube channel linked to this account."}), 404
 
-    channel = g.user.channels[0]
+    channel_id = g.user.channel_id
 
     # Find the comment in our database
-    comment = Comment.query.filter_by(id=comment_id, channel_id=channel.id).first()
+    comment = Comment.query.filter_by(id=comment_id, channel_id=channel_id).first()
     if not comment:
         warning(
             "Comment not found",
             user_id=g.user.id,
             comment_id=comment_id,
-            channel_id=channel.id,
+            channel_id=channel_id,
         )
         return jsonify({"error": "Comment not found."}), 404
 
     try:
         # Get user's credentials
-        from .services import decrypt_data
-
-        access_token = decrypt_data(g.user.access_token_encrypted)
+        credentials = get_user_credentials(g.user)
 
         # Check if access token exists
-        if not access_token:
+        if not credentials.token:
             error("No access token found", user_id=g.user.id)
             return (
                 jsonify(
@@ -450,21 +1060,6 @@ def reply_to_comment(comment_id):
                 401,
             )
 
-        # Create credentials object
-        from google.oauth2.credentials import Credentials
-
-        credentials = Credentials(
-            token=access_token,
-            refresh_token=(
-                decrypt_data(g.user.refresh_token_encrypted)
-                if g.user.refresh_token_encrypted
-                else None
-            ),
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=current_app.config.get("GOOGLE_CLIENT_ID"),
-            client_secret=current_app.config.get("GOOGLE_CLIENT_SECRET"),
-        )
-
         # Create YouTube service and reply to comment
         yt_service = YouTubeService(credentials=credentials)
         response = yt_service.reply_to_comment(comment.youtube_comment_id, reply_text)
@@ -476,6 +1071,7 @@ def reply_to_comment(comment_id):
             youtube_comment_id=comment.youtube_comment_id,
             reply_id=response.get("id"),
         )
+        bump_data_version(channel_id)
 
         return (
             jsonify(
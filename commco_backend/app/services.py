@@ -1,11 +1,58 @@
+import functools
+import hashlib
+import json
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import datetime, timedelta
+import requests
+from dateutil.parser import isoparse
+import google.auth.transport.requests
+import google.oauth2.credentials
+import google_auth_httplib2
+import httplib2
 from googleapiclient.discovery import build
 from cryptography.fernet import Fernet
 from flask import current_app
+from sqlalchemy import select
+from .cache import LRUCache
+from .gemini_client import DeadlineExceeded, get_gemini_client
+from .logging_utils import debug, warning, error
+from .models import db, ClassificationCacheEntry
+from .db_utils import as_utc, dialect_insert
+
+# --- Comment Categories ---
+CATEGORIES = [
+    "Reply to Question",
+    "Appreciate Fan",
+    "Ideas",
+    "Criticisms",
+    "Delete Junk",
+    "Miscellaneous",
+]
+DEFAULT_CATEGORY = "Miscellaneous"
+
+CATEGORY_GUIDE = """            - \"Reply to Question\": The comment is asking a direct, specific question that needs an answer.
+            - \"Appreciate Fan\": The comment contains strong, specific praise, or indicates loyal viewership. It deserves a heart.
+            - \"Ideas\": The comment is a suggestion for improvement, a new video idea, or a creative proposal. It is not spam but could inspire future content.
+            - \"Criticisms\": The comment is constructive criticism, a polite disagreement, or feedback that points out flaws or issues. It is not spam but requires careful thought.
+            - \"Delete Junk\": The comment is spam, a scam, hate speech, or irrelevant self-promotion.
+            - \"Miscellaneous\": The comment doesn't fit into any of the above categories or is unclear."""
+
+# Bump whenever the classification prompts or categories change, so answers
+# cached under the old prompt stop matching.
+PROMPT_VERSION = "1"
 
 
 # --- Encryption Service ---
+@functools.lru_cache(maxsize=4)
+def _fernet(key):
+    return Fernet(key)
+
+
 def get_encryption_suite():
-    return Fernet(current_app.config["ENCRYPTION_KEY"])
+    return _fernet(current_app.config["ENCRYPTION_KEY"])
 
 
 def encrypt_data(data):
@@ -16,14 +63,104 @@ def decrypt_data(encrypted_data):
     return get_encryption_suite().decrypt(encrypted_data).decode("utf-8")
 
 
+# --- Credentials ---
+# Refresh access tokens this long before Google says they expire
+CREDENTIALS_EXPIRY_MARGIN = timedelta(minutes=5)
+
+_credentials_cache = LRUCache(maxsize=1024)
+
+
+class _CachedCredentials:
+    def __init__(self, credentials, stored_token):
+        self.credentials = credentials
+        # Access token as currently saved on the User row
+        self.stored_token = stored_token
+
+
+def _build_credentials(user):
+    return google.oauth2.credentials.Credentials(
+        token=decrypt_data(user.access_token_encrypted),
+        refresh_token=(
+            decrypt_data(user.refresh_token_encrypted)
+            if user.refresh_token_encrypted
+            else None
+        ),
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=current_app.config.get("GOOGLE_CLIENT_ID"),
+        client_secret=current_app.config.get("GOOGLE_CLIENT_SECRET"),
+    )
+
+
+def get_user_credentials(user):
+    """
+    Google credentials for a user, kept per worker process so the tokens are
+    not decrypted and refreshed on every task and request.
+
+    Credentials are refreshed shortly before they expire. Whenever the access
+    token differs from the one stored on the user (a refresh here, or one done
+    by AuthorizedHttp after a 401) the new tokens are written back.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the tokens could not be refreshed
+    """
+    entry = _credentials_cache.get(user.id)
+    if entry is None:
+        credentials = _build_credentials(user)
+        entry = _CachedCredentials(credentials, credentials.token)
+
+    credentials = entry.credentials
+    if (
+        credentials.refresh_token
+        and credentials.expiry is not None
+        and credentials.expiry - CREDENTIALS_EXPIRY_MARGIN <= datetime.utcnow()
+    ):
+        credentials.refresh(google.auth.transport.requests.Request())
+
+    if credentials.token != entry.stored_token:
+        user.access_token_encrypted = encrypt_data(credentials.token)
+        if credentials.refresh_token:
+            user.refresh_token_encrypted = encrypt_data(credentials.refresh_token)
+        db.session.commit()
+        entry.stored_token = credentials.token
+
+    # Keep the entry until just before the token expires, or for the default
+    # TTL when Google has not told us the expiry yet
+    ttl = current_app.config.get("CREDENTIALS_CACHE_TTL", 300)
+    if credentials.expiry is not None:
+        remaining = credentials.expiry - CREDENTIALS_EXPIRY_MARGIN - datetime.utcnow()
+        ttl = max(0, min(ttl, remaining.total_seconds()))
+    _credentials_cache.set(user.id, entry, ttl=ttl)
+    return credentials
+
+
+def invalidate_user_credentials(user_id):
+    """Forget cached credentials, e.g. after the user logged in again."""
+    _credentials_cache.pop(user_id)
+
+
 # --- YouTube Service ---
+@functools.lru_cache(maxsize=None)
+def _youtube_resource():
+    """
+    Build the YouTube Data API resource once per process from the discovery
+    document bundled with google-api-python-client. Its own http object is
+    never used for requests, callers pass their authorized http to execute().
+    """
+    return build("youtube", "v3", http=httplib2.Http(), static_discovery=True)
+
+
 class YouTubeService:
     def __init__(self, credentials):
-        self.service = build("youtube", "v3", credentials=credentials)
+        self.service = _youtube_resource()
+        # Only the per-user part is created per service, it also refreshes
+        # expired access tokens on 401
+        self.http = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http()
+        )
 
     def get_user_channels(self):
         request = self.service.channels().list(part="snippet,contentDetails", mine=True)
-        response = request.execute()
+        response = request.execute(http=self.http)
         return response.get("items", [])
 
     def get_latest_comments(self, channel_id, max_results=50):
@@ -34,9 +171,60 @@ class YouTubeService:
             maxResults=max_results,
             order="time",  # Get the most recent ones
         )
-        response = request.execute()
+        response = request.execute(http=self.http)
         return response.get("items", [])
 
+    def iter_comment_thread_pages(self, channel_id, page_token=None, page_size=100):
+        """
+        Walk commentThreads pages for a channel, newest first, one request per page.
+
+        Args:
+            channel_id (str): The YouTube channel ID
+            page_token (str): Page to start from, None for the first page
+            page_size (int): Threads per page, the API allows at most 100
+
+        Yields:
+            tuple: (items on the page, token of the next page or None)
+        """
+        while True:
+            request = self.service.commentThreads().list(
+                part="snippet",
+                allThreadsRelatedToChannelId=channel_id,
+                maxResults=page_size,
+                order="time",
+                pageToken=page_token,
+            )
+            response = request.execute(http=self.http)
+            page_token = response.get("nextPageToken")
+            yield response.get("items", []), page_token
+            if not page_token:
+                return
+
+    def iter_new_comment_threads(
+        self, channel_id, since=None, max_pages=None, page_token=None
+    ):
+        """
+        Comment threads newer than a watermark, fetching pages lazily.
+
+        Pages are requested only while they can still contain new comments, so a
+        routine sync stops after the first page or two. Threads published at the
+        watermark itself are yielded again, the upsert makes that harmless and it
+        avoids skipping comments that share a timestamp.
+
+        Args:
+            channel_id (str): The YouTube channel ID
+            since (datetime): Publish time of the newest comment already stored,
+                None to walk the whole history
+            max_pages (int): Optional cap on the number of pages fetched
+            page_token (str): Page to continue an earlier, capped walk from
+
+        Returns:
+            CommentThreadWalk: Iterable of the threads, telling afterwards
+            whether the walk got down to the watermark
+        """
+        pages = self.iter_comment_thread_pages(channel_id, page_token=page_token)
+        return CommentThreadWalk(pages, as_utc(since), max_pages)
+
     def reply_to_comment(self, comment_id, reply_text):
         """
         Reply to a YouTube comment using the comments.insert method.
@@ -48,57 +236,94 @@ class YouTubeService:
         Returns:
             dict: The response from the YouTube API containing the created reply
         """
-        from .logging_utils import debug
-
         debug("Replying to comment", comment_id=comment_id, reply_text=reply_text)
         try:
             request = self.service.comments().insert(
                 part="snippet",
                 body={"snippet": {"parentId": comment_id, "textOriginal": reply_text}},
             )
-            response = request.execute()
+            response = request.execute(http=self.http)
             return response
         except Exception as e:
             print(f"Error replying to comment: {e}")
             raise e
 
 
+class CommentThreadWalk:
+    """
+    Threads of a newest-first walk down to a watermark (see
+    YouTubeService.iter_new_comment_threads). Once iterated, `complete` tells
+    whether the walk reached the watermark or the last page. If max_pages
+    stopped it first, `next_page_token` is the page to continue from: the
+    threads between there and the watermark have not been seen yet.
+    """
+
+    def __init__(self, pages, since, max_pages):
+        self.complete = False
+        self.next_page_token = None
+        self._items = self._walk(pages, since, max_pages)
+
+    def __iter__(self):
+        return self._items
+
+    def _walk(self, pages, since, max_pages):
+        for page_number, (items, next_page_token) in enumerate(pages, start=1):
+            for item in items:
+                published_at = isoparse(
+                    item["snippet"]["topLevelComment"]["snippet"]["publishedAt"]
+                )
+                if since is not None and published_at < since:
+                    self.complete = True
+                    return
+                yield item
+            if not next_page_token:
+                self.complete = True
+                return
+            if max_pages and page_number >= max_pages:
+                self.next_page_token = next_page_token
+                return
+
+
 class GeminiService:
     def __init__(self):
         self.api_key = current_app.config["GEMINI_API_KEY"]
         self.api_url = current_app.config["GEMINI_API_URL"]
+        self.max_concurrency = current_app.config.get("GEMINI_MAX_CONCURRENCY", 4)
+        # Shared by the classification threads, so resolve it while the app
+        # context is available
+        self.client = get_gemini_client(current_app.config)
 
-    def generate_content(self, prompt):
+    def generate_content(self, prompt, deadline=None):
         """
         Generate content using Gemini API
         Args:
             prompt (str): The text prompt to send to Gemini
+            deadline (float): Optional time.monotonic() to give up at
         Returns:
             dict: The API response containing the generated content
         """
-        import requests
-
-        headers = {"Content-Type": "application/json"}
         data = {"contents": [{"parts": [{"text": prompt}]}]}
         try:
-            response = requests.post(
-                f"{self.api_url}?key={self.api_key}", headers=headers, json=data
+            return self.client.post_json(
+                self.api_url, self.api_key, data, deadline=deadline
             )
-            response.raise_for_status()
-            return response.json()
+        except DeadlineExceeded:
+            debug("Gemini request abandoned at the deadline")
+            return None
         except requests.exceptions.RequestException as e:
-            print(f"Error calling Gemini API: {e}")
+            error("Error calling Gemini API", error=str(e))
             return None
 
-    def get_text_response(self, prompt):
+    def get_text_response(self, prompt, deadline=None):
         """
         Get just the text response from Gemini API
         Args:
             prompt (str): The text prompt to send to Gemini
+            deadline (float): Optional time.monotonic() to give up at
         Returns:
             str: The generated text response or None if there was an error
         """
-        response = self.generate_content(prompt)
+        response = self.generate_content(prompt, deadline=deadline)
         if response and "candidates" in response:
             try:
                 return response["candidates"][0]["content"]["parts"][0]["text"]
@@ -108,14 +333,16 @@ class GeminiService:
         return None
 
     def classify_comment(self, comment_text):
+        return self._classify_one(comment_text) or DEFAULT_CATEGORY
+
+    def _classify_one(self, comment_text, deadline=None):
+        """
+        Classify a single comment, returning None if Gemini gave no answer or
+        none of the categories, so that nothing invalid is cached or saved.
+        """
         prompt = f"""
             You are a YouTube Comment Classifier for a professional content creator. Your job is to categorize the following comment into ONE of the following action-based categories:
-            - \"Reply to Question\": The comment is asking a direct, specific question that needs an answer.
-            - \"Appreciate Fan\": The comment contains strong, specific praise, or indicates loyal viewership. It deserves a heart.
-            - \"Ideas\": The comment is a suggestion for improvement, a new video idea, or a creative proposal. It is not spam but could inspire future content.
-            - \"Criticisms\": The comment is constructive criticism, a polite disagreement, or feedback that points out flaws or issues. It is not spam but requires careful thought.
-            - \"Delete Junk\": The comment is spam, a scam, hate speech, or irrelevant self-promotion.
-            - \"Miscellaneous\": The comment doesn't fit into any of the above categories or is unclear.
+{CATEGORY_GUIDE}
 
             Analyze the user's comment below and return ONLY the category name in a JSON format in the given format only.
 
@@ -125,30 +352,251 @@ class GeminiService:
             {{"category": "YOUR_CHOSEN_CATEGORY"}}
             """
         try:
-            import json
-
-            response_text = self.get_text_response(prompt)
-            if response_text:
-                # Try to parse the JSON response
-                try:
-                    response_json = json.loads(response_text)
-                    category = response_json.get("category")
-                    if category:
+            response_text = self.get_text_response(prompt, deadline=deadline)
+            if not response_text:
+                return None
+
+            # Try to parse the JSON response
+            try:
+                response_json = json.loads(_strip_code_fence(response_text))
+                category = response_json.get("category")
+                if category in CATEGORIES:
+                    return category
+            except json.JSONDecodeError:
+                # If JSON parsing fails, try to extract category from text
+                for category in CATEGORIES:
+                    if category != DEFAULT_CATEGORY and category in response_text:
                         return category
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, try to extract category from text
-                    if "Reply to Question" in response_text:
-                        return "Reply to Question"
-                    elif "Appreciate Fan" in response_text:
-                        return "Appreciate Fan"
-                    elif "Ideas" in response_text:
-                        return "Ideas"
-                    elif "Criticisms" in response_text:
-                        return "Criticisms"
-                    elif "Delete Junk" in response_text:
-                        return "Delete Junk"
-
-            return "Miscellaneous"
+
+            warning("Gemini answered with no valid category", response=response_text)
+            return None
         except Exception as e:
             print(f"Error classifying comment with Gemini: {e}")
-            return "Miscellaneous"
+            return None
+
+    def classify_comments(self, comments, default=DEFAULT_CATEGORY, deadline=None):
+        """
+        Classify many comments with as few Gemini requests as possible.
+        Chunks are sent concurrently, at most GEMINI_MAX_CONCURRENCY at a time.
+        Args:
+            comments (dict): Mapping of comment ID to comment text
+            default: Category used for comments Gemini could not classify at all,
+                or did not classify before the deadline
+            deadline (float): Seconds to wait for all chunks, defaults to
+                GEMINI_CLASSIFY_DEADLINE
+        Returns:
+            dict: Mapping of the same comment IDs, in the same order, to their category
+        """
+        if not comments:
+            return {}
+        if deadline is None:
+            deadline = current_app.config.get("GEMINI_CLASSIFY_DEADLINE", 300)
+        # Handed to every chunk, so requests and retries still running when
+        # the wait below gives up stop too instead of spending quota for nothing
+        expires_at = time.monotonic() + deadline
+
+        labels = {}
+        chunks = list(self._chunk_comments(comments))
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(chunks)),
+            thread_name_prefix="gemini",
+        )
+        try:
+            futures = [
+                pool.submit(self._label_chunk, chunk, expires_at) for chunk in chunks
+            ]
+            for future in as_completed(futures, timeout=deadline):
+                labels.update(future.result())
+        except FuturesTimeoutError:
+            warning(
+                "Comment classification hit its deadline",
+                deadline=deadline,
+                classified=len(labels),
+                total=len(comments),
+            )
+        finally:
+            # Do not wait for stragglers past the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return {
+            comment_id: labels.get(comment_id) or default for comment_id in comments
+        }
+
+    def _label_chunk(self, chunk, deadline=None):
+        """
+        Classify one chunk, asking for any comment the batch answer skipped or
+        garbled on its own. Never raises, failed comments are left out, and so
+        is everything not classified by the deadline (time.monotonic()).
+        """
+        started = time.monotonic()
+        try:
+            labels = self._classify_chunk(chunk, deadline=deadline)
+        except Exception as e:
+            warning("Batch classification failed", error=str(e), size=len(chunk))
+            labels = {}
+
+        for comment_id, text in chunk:
+            if comment_id in labels:
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            debug("Falling back to single classification", comment_id=comment_id)
+            category = self._classify_one(text, deadline=deadline)
+            if category is not None:
+                labels[comment_id] = category
+
+        latency = time.monotonic() - started
+        debug(
+            "Classified comment chunk",
+            size=len(chunk),
+            latency=f"{latency:.3f}s",
+            per_item_latency=f"{latency / len(chunk):.3f}s",
+        )
+        return labels
+
+    def _chunk_comments(self, comments):
+        """Split comments into chunks bounded by item count and prompt size."""
+        max_items = current_app.config.get("GEMINI_BATCH_SIZE", 25)
+        max_chars = current_app.config.get("GEMINI_BATCH_MAX_CHARS", 12000)
+
+        chunk, chunk_chars = [], 0
+        for comment_id, text in comments.items():
+            if chunk and (
+                len(chunk) >= max_items or chunk_chars + len(text) > max_chars
+            ):
+                yield chunk
+                chunk, chunk_chars = [], 0
+            chunk.append((comment_id, text))
+            chunk_chars += len(text)
+        if chunk:
+            yield chunk
+
+    def _classify_chunk(self, chunk, deadline=None):
+        """
+        Classify one chunk in a single request.
+        Returns only the labels Gemini answered with a valid category.
+        """
+        if len(chunk) == 1:
+            # A lone comment is cheaper with the single-comment prompt, which
+            # classify_comments falls back to for anything left unlabeled.
+            return {}
+
+        # Number the comments instead of sending YouTube IDs, it is shorter
+        # and the model cannot mangle them.
+        numbered = "\n".join(
+            f"{index}: {json.dumps(text, ensure_ascii=False)}"
+            for index, (_, text) in enumerate(chunk, start=1)
+        )
+        prompt = f"""
+            You are a YouTube Comment Classifier for a professional content creator. Your job is to categorize EACH of the following comments into ONE of the following action-based categories:
+{CATEGORY_GUIDE}
+
+            The comments are numbered, one per line, each given as a JSON string.
+
+            Comments:
+{numbered}
+
+            Return ONLY a JSON object mapping every comment number to its category name, for example:
+            {{"1": "Ideas", "2": "Delete Junk"}}
+            """
+        response_text = self.get_text_response(prompt, deadline=deadline)
+        if not response_text:
+            return {}
+
+        try:
+            response_json = json.loads(_strip_code_fence(response_text))
+        except json.JSONDecodeError as e:
+            warning("Could not parse batch classification response", error=str(e))
+            return {}
+        if not isinstance(response_json, dict):
+            return {}
+
+        labels = {}
+        for index, (comment_id, _) in enumerate(chunk, start=1):
+            category = response_json.get(str(index))
+            if category in CATEGORIES:
+                labels[comment_id] = category
+        return labels
+
+
+# --- Classification Cache ---
+_classification_lru = LRUCache(maxsize=10000)
+
+
+def normalize_comment_text(text):
+    """Fold case, unicode forms and whitespace so trivial variants hash alike."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class ClassificationCache:
+    """
+    Remembers Gemini's category for comment text, keyed by a hash of the
+    normalized text, the prompt version and the model. Entries live in the
+    classification_cache table with a per-process LRU in front of it.
+    """
+
+    def __init__(self):
+        self.model = current_app.config["GEMINI_API_URL"]
+
+    def key_for(self, comment_text):
+        content = "\0".join(
+            [PROMPT_VERSION, self.model, normalize_comment_text(comment_text)]
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Look up cached categories.
+        Returns:
+            dict: Mapping of the keys that were found to their category
+        """
+        found = {}
+        missing = []
+        for key in set(keys):
+            category = _classification_lru.get(key)
+            if category is None:
+                missing.append(key)
+            else:
+                found[key] = category
+
+        if missing:
+            rows = db.session.execute(
+                select(
+                    ClassificationCacheEntry.content_hash,
+                    ClassificationCacheEntry.category,
+                ).where(ClassificationCacheEntry.content_hash.in_(missing))
+            )
+            for key, category in rows:
+                _classification_lru.set(key, category)
+                found[key] = category
+        return found
+
+    def set_many(self, entries):
+        """
+        Store categories for keys that are not cached yet.
+        Args:
+            entries (dict): Mapping of cache key to category
+        """
+        if not entries:
+            return
+
+        # Another sync may have cached the same text meanwhile, first one wins
+        db.session.execute(
+            dialect_insert(ClassificationCacheEntry).on_conflict_do_nothing(),
+            [
+                {"content_hash": key, "category": category}
+                for key, category in entries.items()
+            ],
+        )
+        db.session.commit()
+        for key, category in entries.items():
+            _classification_lru.set(key, category)
+
+
+def _strip_code_fence(text):
+    """Gemini likes to wrap JSON answers in ```json fences."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
@@ -0,0 +1,83 @@
+"""
+Per-channel sync lock
+
+A Redis key per channel holds the Celery task ID of the sync that is queued
+or running for it. A second request finds the key and attaches to that task
+instead of starting another one. The key expires after SYNC_LOCK_TTL seconds
+so a worker that died mid-sync cannot block the channel forever; a running
+sync renews it after every batch, so a long one never outlives its lock.
+"""
+
+from flask import current_app
+import redis
+
+from .extensions import get_redis
+from .logging_utils import warning
+
+LOCK_KEY = "sync-lock:channel:{}"
+
+# Delete the key only if it still belongs to the caller
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+# Push the key's expiry out only if it still belongs to the caller
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def claim_channel_sync(channel_id, task_id):
+    """
+    Try to make task_id the channel's sync.
+    Returns:
+        str: ID of the task holding the lock, task_id itself if it got it
+    """
+    key = LOCK_KEY.format(channel_id)
+    ttl = current_app.config.get("SYNC_LOCK_TTL", 1800)
+    try:
+        client = get_redis()
+        while True:
+            if client.set(key, task_id, nx=True, ex=ttl):
+                return task_id
+            holder = client.get(key)
+            if holder is not None:
+                return holder.decode("utf-8")
+            # The lock expired between SET and GET, try again
+    except redis.RedisError as e:
+        # Duplicate work is better than no sync at all
+        warning("Sync lock unavailable", channel_id=channel_id, error=str(e))
+        return task_id
+
+
+def release_channel_sync(channel_id, task_id):
+    try:
+        get_redis().eval(_RELEASE_SCRIPT, 1, LOCK_KEY.format(channel_id), task_id)
+    except redis.RedisError as e:
+        warning("Failed to release sync lock", channel_id=channel_id, error=str(e))
+
+
+def renew_channel_sync(channel_id, task_id):
+    """
+    Give task_id's lock on the channel another SYNC_LOCK_TTL seconds.
+    Returns:
+        bool: False if the lock was lost (expired or taken by another task)
+    """
+    ttl = current_app.config.get("SYNC_LOCK_TTL", 1800)
+    try:
+        renewed = get_redis().eval(
+            _RENEW_SCRIPT, 1, LOCK_KEY.format(channel_id), task_id, ttl
+        )
+    except redis.RedisError as e:
+        warning("Failed to renew sync lock", channel_id=channel_id, error=str(e))
+        return True
+    if not renewed:
+        warning("Sync lock lost", channel_id=channel_id, task_id=task_id)
+    return bool(renewed)
@@ -0,0 +1,164 @@
+"""
+Sync job status
+
+Progress of each channel sync is kept in a Redis hash under its job (Celery
+task) ID for a day, and every finished sync is announced on a per-channel
+pub/sub channel that the dashboard listens to over Server-Sent Events while
+it waits for a sync it started.
+Status tracking never fails a sync: Redis errors are logged and ignored.
+"""
+
+import json
+import time
+
+import redis
+
+from .extensions import get_redis
+from .logging_utils import warning
+
+JOB_KEY = "sync-job:{}"
+EVENTS_CHANNEL = "sync-events:channel:{}"
+JOB_TTL = 24 * 60 * 60
+# Statuses a job never leaves
+FINAL_STATUSES = ("completed", "failed", "skipped")
+
+
+class SyncJobStatus:
+    """Records the progress of one sync job."""
+
+    def __init__(self, job_id, channel_id):
+        self.job_id = job_id
+        self.channel_id = channel_id
+
+    def _save(self, **fields):
+        key = JOB_KEY.format(self.job_id)
+        fields["channel_id"] = self.channel_id
+        try:
+            pipe = get_redis().pipeline()
+            pipe.hset(key, mapping={k: str(v) for k, v in fields.items()})
+            pipe.expire(key, JOB_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            warning("Failed to save sync status", job_id=self.job_id, error=str(e))
+
+    def _publish(self, event):
+        event["job_id"] = self.job_id
+        try:
+            get_redis().publish(
+                EVENTS_CHANNEL.format(self.channel_id), json.dumps(event)
+            )
+        except redis.RedisError as e:
+            warning("Failed to publish sync event", job_id=self.job_id, error=str(e))
+
+    def queued(self):
+        self._save(status="queued")
+
+    def started(self):
+        self._save(status="running")
+
+    def progress(self, totals):
+        self._save(
+            status="running",
+            processed=totals["processed"],
+            added=totals["added"],
+            updated=totals["updated"],
+        )
+
+    def complete(self, message, totals):
+        """Record a finished sync and tell listeners. Returns message."""
+        self._save(
+            status="completed",
+            processed=totals["processed"],
+            added=totals["added"],
+            updated=totals["updated"],
+            message=message,
+        )
+        self._publish(
+            {
+                "status": "completed",
+                "added": totals["added"],
+                "updated": totals["updated"],
+            }
+        )
+        return message
+
+    def fail(self, message):
+        """Record a failed sync and tell listeners. Returns message."""
+        self._save(status="failed", message=message)
+        self._publish({"status": "failed", "message": message})
+        return message
+
+    def skip(self, message, running_job_id):
+        """
+        Record a sync that did not run because `running_job_id` already holds
+        the channel, and tell listeners which job to follow instead.
+        Returns message.
+        """
+        self._save(status="skipped", message=message, running_job_id=running_job_id)
+        self._publish(
+            {"status": "skipped", "message": message, "running_job_id": running_job_id}
+        )
+        return message
+
+
+def get_sync_job(job_id):
+    """
+    Returns:
+        dict: The job's status fields, None if unknown or expired
+    """
+    fields = get_redis().hgetall(JOB_KEY.format(job_id))
+    if not fields:
+        return None
+    job = {k.decode("utf-8"): v.decode("utf-8") for k, v in fields.items()}
+    for name in ("channel_id", "processed", "added", "updated"):
+        if name in job:
+            job[name] = int(job[name])
+    job["id"] = job_id
+    return job
+
+
+def _final_event(job):
+    """The event a finished job published, rebuilt from its status fields."""
+    event = {"status": job["status"], "job_id": job["id"]}
+    for name in ("added", "updated", "message", "running_job_id"):
+        if name in job:
+            event[name] = job[name]
+    return event
+
+
+def iter_sync_events(channel_id, job_id, heartbeat=15, max_lifetime=300):
+    """
+    Yield Server-Sent Events for one sync job of the channel until it has
+    finished, with a comment line every `heartbeat` seconds to keep proxies
+    from closing the connection. The stream also ends after `max_lifetime`
+    seconds, so it never ties up a worker for long; EventSource reconnects
+    by itself, and a job that finished in between is reported straight away.
+    """
+    pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(EVENTS_CHANNEL.format(channel_id))
+    try:
+        yield ": connected\n\n"
+        # Subscribed before looking, so the job cannot finish unnoticed
+        job = get_sync_job(job_id)
+        if job is not None and job["status"] in FINAL_STATUSES:
+            yield f"event: sync\ndata: {json.dumps(_final_event(job))}\n\n"
+            return
+
+        closes_at = time.monotonic() + max_lifetime
+        while True:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                return
+            message = pubsub.get_message(timeout=min(heartbeat, remaining))
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = message["data"].decode("utf-8")
+            event = json.loads(data)
+            if event.get("job_id") != job_id:
+                continue
+            yield f"event: sync\ndata: {data}\n\n"
+            if event.get("status") in FINAL_STATUSES:
+                return
+    finally:
+        pubsub.close()
@@ -1,97 +1,789 @@
 from flask import current_app
-from .models import db, User, Channel, Comment
-from .services import YouTubeService, decrypt_data, GeminiService, encrypt_data
-from datetime import datetime
+from .models import (
+    db,
+    User,
+    Channel,
+    Comment,
+    BackfillJob,
+    ChannelCategoryCount,
+    VideoCategoryCount,
+)
+from .services import (
+    YouTubeService,
+    GeminiService,
+    ClassificationCache,
+    DEFAULT_CATEGORY,
+    get_user_credentials,
+)
+import itertools
+import time
+import random
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from dateutil.parser import isoparse
-import google.oauth2.credentials
-import google.auth.transport.requests
+from sqlalchemy import case, func, select, update
 from .extensions import celery
+from .preclassifier import RuleBasedClassifier
+from .dedup import cluster_comments
+from .logging_utils import info, warning, error
+from .sync_lock import claim_channel_sync, release_channel_sync, renew_channel_sync
+from .sync_status import SyncJobStatus
+from .listing_cache import bump_data_version
+from .db_utils import as_utc, dialect_insert
 
 
-@celery.task(name="app.process_channel_comments")
-def process_channel_comments(channel_id):
+def enqueue_channel_sync(channel_id):
+    """
+    Queue a sync for the channel unless one is already queued or running.
+    Returns:
+        tuple: (task ID of the sync handling the request, whether it was newly queued)
+    """
+    task_id = str(uuid.uuid4())
+    holder = claim_channel_sync(channel_id, task_id)
+    if holder != task_id:
+        return holder, False
+    try:
+        SyncJobStatus(task_id, channel_id).queued()
+        process_channel_comments.apply_async(args=[channel_id], task_id=task_id)
+    except Exception:
+        release_channel_sync(channel_id, task_id)
+        raise
+    return task_id, True
+
+
+@celery.task(name="app.process_channel_comments", bind=True)
+def process_channel_comments(self, channel_id):
+    # Syncs queued through enqueue_channel_sync already hold the lock under
+    # their task ID, anything else (e.g. a direct call) claims it here
+    task_id = self.request.id or str(uuid.uuid4())
+    holder = claim_channel_sync(channel_id, task_id)
+    status = SyncJobStatus(task_id, channel_id)
+    if holder != task_id:
+        return status.skip(
+            f"Skipped: sync {holder} is already running for this channel.", holder
+        )
+    status.started()
+    try:
+        return _process_channel_comments(channel_id, status)
+    except Exception as e:
+        status.fail(f"Sync failed: {e}")
+        raise
+    finally:
+        release_channel_sync(channel_id, task_id)
+
+
+def _process_channel_comments(channel_id, status):
     channel = Channel.query.get(channel_id)
     if not channel:
-        return "Channel not found."
+        return status.fail("Channel not found.")
 
     user = channel.user
 
-    # 1. Decrypt tokens to get credentials
-    decrypted_access_token = decrypt_data(user.access_token_encrypted)
-    decrypted_refresh_token = decrypt_data(user.refresh_token_encrypted)
+    # 1. Get the user's credentials, refreshed if they are about to expire
+    try:
+        creds = get_user_credentials(user)
+    except Exception as e:
+        print(f"Failed to refresh token: {e}")
+        return status.fail(f"Token refresh failed: {e}")
 
-    creds = google.oauth2.credentials.Credentials(
-        token=decrypted_access_token,
-        refresh_token=decrypted_refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=celery.conf.get("GOOGLE_CLIENT_ID"),
-        client_secret=celery.conf.get("GOOGLE_CLIENT_SECRET"),
+    # 2. Initialize Services
+    yt_service = YouTubeService(credentials=creds)
+    ai_service = GeminiService()
+    # One Gemini deadline for the whole sync, however many batches it takes
+    classify_deadline = time.monotonic() + current_app.config.get(
+        "GEMINI_CLASSIFY_DEADLINE", 300
     )
 
-    # 2. Refresh token if needed
-    if creds.expired and creds.refresh_token:
+    # 3. Stream comments newer than the channel's watermark from YouTube and
+    # classify, save and commit them one batch at a time. Memory stays flat
+    # however many comments there are, and batches saved before a crash are
+    # kept (the next sync finds them in the classification cache and table).
+    # A walk an earlier capped sync left unfinished is continued first
+    batch_size = current_app.config.get("SYNC_BATCH_SIZE", 200)
+    walk = yt_service.iter_new_comment_threads(
+        channel.youtube_channel_id,
+        since=channel.last_comment_published_at,
+        max_pages=current_app.config.get("SYNC_MAX_PAGES"),
+        page_token=channel.sync_resume_page_token,
+    )
+    comment_threads = iter(walk)
+    totals = Counter()
+    newest = as_utc(channel.sync_resume_newest_at)
+    oldest = None
+    while True:
         try:
-            creds.refresh(google.auth.transport.requests.Request())
-            # Update stored tokens with refreshed ones
-            user.access_token_encrypted = encrypt_data(creds.token)
-            if creds.refresh_token:
-                user.refresh_token_encrypted = encrypt_data(creds.refresh_token)
-            db.session.commit()
+            items = list(itertools.islice(comment_threads, batch_size))
         except Exception as e:
-            print(f"Failed to refresh token: {e}")
-            return f"Token refresh failed: {e}"
+            if "insufficientPermissions" in str(e) or "403" in str(e):
+                return status.fail(
+                    f"Permission denied: User may not have access to comments on channel {channel.youtube_channel_id}. Error: {e}"
+                )
+            else:
+                return status.fail(
+                    f"Failed to fetch comments after saving {totals['added']} new comments: {e}"
+                )
+        if not items:
+            break
+
+        # 4. Classify the batch, only sending what we cannot settle locally to Gemini
+        rows = [_comment_row(item, channel.id) for item in items]
+        totals.update(
+            classify_rows(rows, ai_service, channel.id, deadline=classify_deadline)
+        )
+
+        # 5. Save new comments and update changed categories in bulk, this commits
+        added, updated = upsert_comments(rows)
+        totals.update(processed=len(rows), added=added, updated=updated)
+        status.progress(totals)
+        renew_channel_sync(channel.id, status.job_id)
+        batch_newest = max(row["published_at"] for row in rows)
+        if newest is None or batch_newest > newest:
+            newest = batch_newest
+        batch_oldest = min(row["published_at"] for row in rows)
+        if oldest is None or batch_oldest < oldest:
+            oldest = batch_oldest
+
+    # 5b. Retry comments earlier syncs could not classify, they are behind
+    # the watermark and would otherwise keep the default category for good
+    totals["reclassified"] += reclassify_pending_comments(
+        channel.id, ai_service, classify_deadline
+    )
+
+    # 6. Move the watermark only once every page down to it was saved,
+    # otherwise comments in pages we never reached would be skipped for good.
+    # A walk stopped by SYNC_MAX_PAGES leaves a resume point instead.
+    if walk.complete:
+        watermark = as_utc(channel.last_comment_published_at)
+        if newest is not None and (watermark is None or newest > watermark):
+            channel.last_comment_published_at = newest
+        channel.sync_resume_page_token = None
+        channel.sync_resume_newest_at = None
+    else:
+        channel.sync_resume_page_token = walk.next_page_token
+        channel.sync_resume_newest_at = newest
+
+    # 7. Pick the next scheduled sync from how busy the channel is
+    _schedule_next_sync(channel, totals["added"], oldest)
+    db.session.commit()
+
+    return status.complete(
+        f"Processed {totals['processed']} comments. Added {totals['added']} new comments, updated {totals['updated']} existing comments. Pre-classified locally: {totals['preclassified']}. Near-duplicates: {totals['duplicates']}. Classification cache hits: {totals['cache_hits']}, misses: {totals['cache_misses']}. Reclassified: {totals['reclassified']}.",
+        totals,
+    )
+
+
+@celery.task(name="app.schedule_due_syncs")
+def schedule_due_syncs():
+    """
+    Run by Celery beat every minute: queues a sync for every channel whose
+    next_sync_at has passed. Channels that were never synced go first.
+    """
+    now = datetime.now(timezone.utc)
+    batch_size = current_app.config.get("SYNC_DISPATCH_BATCH_SIZE", 100)
+    due_channels = (
+        Channel.query.filter(
+            Channel.next_sync_at.is_(None) | (Channel.next_sync_at <= now)
+        )
+        .order_by(Channel.next_sync_at.asc().nullsfirst())
+        .limit(batch_size)
+        .all()
+    )
+
+    # Push the schedule out before queueing, so a slow or failing sync is not
+    # queued again on every tick. A finished sync reschedules properly.
+    retry_after = timedelta(minutes=current_app.config.get("SYNC_RETRY_MINUTES", 60))
+    for channel in due_channels:
+        channel.next_sync_at = now + _jittered(retry_after)
+    db.session.commit()
+
+    queued = 0
+    for channel in due_channels:
+        _, is_new = enqueue_channel_sync(channel.id)
+        queued += is_new
+
+    if due_channels:
+        info(
+            "Queued scheduled channel syncs",
+            due=len(due_channels),
+            queued=queued,
+        )
+    return f"Queued {queued} scheduled syncs."
+
+
+def _jittered(interval):
+    """Spread schedules by +/- SYNC_JITTER so channels do not sync in lockstep."""
+    jitter = current_app.config.get("SYNC_JITTER", 0.2)
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+
+def _schedule_next_sync(channel, new_comment_count, oldest_published_at=None):
+    """
+    Update the channel's comment velocity and set next_sync_at so a sync
+    finds roughly SYNC_TARGET_NEW_COMMENTS new comments: busy channels sync
+    every few minutes, dormant ones rarely.
+
+    Args:
+        oldest_published_at (datetime): Publish time of the oldest comment the
+            sync fetched, seeds the velocity of a channel's first sync
+    """
+    now = datetime.now(timezone.utc)
+    last_synced_at = as_utc(channel.last_synced_at)
+
+    if last_synced_at is not None:
+        hours = max((now - last_synced_at).total_seconds() / 3600, 1 / 60)
+        # Exponentially smoothed, so one quiet or noisy sync does not swing it
+        channel.comment_velocity = 0.5 * (channel.comment_velocity or 0.0) + 0.5 * (
+            new_comment_count / hours
+        )
+    elif new_comment_count and oldest_published_at is not None:
+        # First sync, nothing to compare with yet: the comments it found
+        # accumulated since the oldest of them was published
+        hours = max((now - oldest_published_at).total_seconds() / 3600, 1 / 60)
+        channel.comment_velocity = new_comment_count / hours
+    channel.last_synced_at = now
+
+    min_interval = timedelta(minutes=current_app.config.get("SYNC_MIN_MINUTES", 5))
+    max_interval = timedelta(minutes=current_app.config.get("SYNC_MAX_MINUTES", 1440))
+    if channel.comment_velocity > 0:
+        target = current_app.config.get("SYNC_TARGET_NEW_COMMENTS", 20)
+        interval = timedelta(hours=target / channel.comment_velocity)
+        interval = min(max(interval, min_interval), max_interval)
+    else:
+        interval = max_interval
+    channel.next_sync_at = now + _jittered(interval)
+
+
+def start_channel_backfill(channel_id):
+    """
+    Queue a full-history backfill for the channel. An active job is returned
+    as is, a failed or stalled one is resumed from its checkpoint and a new
+    job is created otherwise.
+
+    Returns:
+        BackfillJob: The job crawling the channel
+    """
+    job = (
+        BackfillJob.query.filter_by(channel_id=channel_id)
+        .order_by(BackfillJob.id.desc())
+        .first()
+    )
+
+    if job is not None and job.status in ("pending", "running"):
+        updated_at = as_utc(job.updated_at)
+        stale_after = timedelta(
+            minutes=current_app.config.get("BACKFILL_STALE_MINUTES", 30)
+        )
+        if datetime.now(timezone.utc) - updated_at < stale_after:
+            return job
+        # No checkpoint for a while, the worker running it is gone
+        info("Resuming stalled backfill", job_id=job.id, channel_id=channel_id)
+    elif job is None or job.status == "completed":
+        job = BackfillJob(channel_id=channel_id)
+        db.session.add(job)
+
+    job.status = "pending"
+    job.error = None
+    db.session.commit()
+    backfill_channel_comments.delay(job.id)
+    return job
+
+
+@celery.task(
+    name="app.backfill_channel_comments", acks_late=True, reject_on_worker_lost=True
+)
+def backfill_channel_comments(job_id):
+    """
+    Crawl every comment thread of a channel, oldest pages last, saving and
+    checkpointing after each page. Routed to the low-priority backfill queue
+    and acknowledged late, so a job lost with its worker is redelivered and
+    continues from the last checkpoint.
+
+    A redelivery can also reach a job that is still running (the broker's
+    visibility timeout ran out first), so every run claims the job under its
+    own owner ID and stops as soon as another run has taken it over.
+    """
+    owner = str(uuid.uuid4())
+    if not _claim_backfill(job_id, owner):
+        return "Backfill job not found, already completed or running elsewhere."
+
+    job = db.session.get(BackfillJob, job_id)
+    channel = job.channel
+    try:
+        creds = get_user_credentials(channel.user)
+    except Exception as e:
+        return _fail_backfill(job, owner, f"Token refresh failed: {e}")
 
-    # 2. Initialize Services
     yt_service = YouTubeService(credentials=creds)
     ai_service = GeminiService()
 
-    # 3. Fetch latest comments from YouTube
+    pages = yt_service.iter_comment_thread_pages(
+        channel.youtube_channel_id, page_token=job.next_page_token
+    )
     try:
-        comments_from_api = yt_service.get_latest_comments(channel.youtube_channel_id)
+        for items, next_page_token in pages:
+            rows = [_comment_row(item, channel.id) for item in items]
+            classify_rows(rows, ai_service, channel.id)
+            added, _ = upsert_comments(rows)
+
+            # Checkpoint: a restarted job continues with the next page
+            if not _owns_backfill(job, owner):
+                return "Backfill taken over by another run."
+            job.next_page_token = next_page_token
+            job.pages_done += 1
+            job.comments_processed += len(rows)
+            job.comments_added += added
+            db.session.commit()
     except Exception as e:
-        if "insufficientPermissions" in str(e) or "403" in str(e):
-            return f"Permission denied: User may not have access to comments on channel {channel.youtube_channel_id}. Error: {e}"
-        else:
-            return f"Failed to fetch comments: {e}"
-
-    # 4. Process and save/update comments
-    new_comment_count = 0
-    updated_comment_count = 0
-    for item in comments_from_api:
-        top_level_comment = item["snippet"]["topLevelComment"]["snippet"]
-        comment_id_yt = item["snippet"]["topLevelComment"]["id"]
-
-        # Check if comment already exists
-        existing_comment = (
-            db.session.query(Comment)
-            .filter_by(youtube_comment_id=comment_id_yt)
-            .first()
+        db.session.rollback()
+        return _fail_backfill(job, owner, str(e))
+
+    if not _owns_backfill(job, owner):
+        return "Backfill taken over by another run."
+    job.status = "completed"
+    job.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+    info(
+        "Backfill completed",
+        job_id=job.id,
+        channel_id=channel.id,
+        pages=job.pages_done,
+        added=job.comments_added,
+    )
+    return f"Backfilled {job.comments_processed} comments over {job.pages_done} pages. Added {job.comments_added} new comments."
+
+
+def _claim_backfill(job_id, owner):
+    """
+    Atomically make `owner` the run of a backfill job. Fails for a completed
+    job and for one another run is working on, unless that run has not
+    checkpointed for BACKFILL_STALE_MINUTES.
+    """
+    stale_before = datetime.now(timezone.utc) - timedelta(
+        minutes=current_app.config.get("BACKFILL_STALE_MINUTES", 30)
+    )
+    claimed = db.session.execute(
+        update(BackfillJob)
+        .where(
+            BackfillJob.id == job_id,
+            BackfillJob.status != "completed",
+            (BackfillJob.status != "running") | (BackfillJob.updated_at < stale_before),
         )
+        .values(status="running", owner=owner, error=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        info("Backfill not claimed", job_id=job_id)
+    return bool(claimed)
+
+
+def _owns_backfill(job, owner):
+    """
+    Lock the job row and check this run still owns it, before the job is
+    written to. Otherwise the lock is released and the run has to stop.
+    """
+    db.session.refresh(job, with_for_update=True)
+    if job.owner == owner:
+        return True
+    db.session.rollback()
+    warning(
+        "Backfill taken over by another run",
+        job_id=job.id,
+        channel_id=job.channel_id,
+    )
+    return False
 
-        # Classify with AI
-        category = ai_service.classify_comment(top_level_comment["textOriginal"])
 
-        if existing_comment:
-            # Update existing comment's category
-            if existing_comment.category != category:
-                existing_comment.category = category
-                updated_comment_count += 1
+def _fail_backfill(job, owner, message):
+    if not _owns_backfill(job, owner):
+        return f"Backfill failed after being taken over: {message}"
+    job.status = "failed"
+    job.error = message
+    db.session.commit()
+    error("Backfill failed", job_id=job.id, channel_id=job.channel_id, error=message)
+    return f"Backfill failed: {message}"
+
+
+def classify_rows(rows, ai_service, channel_id, deadline=None):
+    """
+    Set the category of every comment row. Local rules settle the obvious
+    comments, near-duplicates share one classification, the classification
+    cache answers text we have seen before and only the rest is sent to Gemini.
+    Rows Gemini could not classify get the default category and
+    needs_classification, so a later sync tries them again.
+
+    Args:
+        deadline (float): time.monotonic() by which Gemini must have answered,
+            shared by every batch of a sync; None gives this call its own
+            GEMINI_CLASSIFY_DEADLINE
+
+    Returns:
+        dict: How many rows each stage handled, cache hits and misses are
+        counted per cluster
+    """
+    stats = {"preclassified": 0, "duplicates": 0, "cache_hits": 0, "cache_misses": 0}
+    pending = rows
+    for row in rows:
+        row["needs_classification"] = False
+
+    if current_app.config.get("PRECLASSIFIER_ENABLED", True):
+        preclassifier = RuleBasedClassifier(
+            min_confidence=current_app.config.get("PRECLASSIFIER_MIN_CONFIDENCE", 0.85)
+        )
+        pending = []
+        for row in rows:
+            category = preclassifier.classify(row["text_original"])
+            if category is None:
+                pending.append(row)
+            else:
+                row["category"] = category
+        stats["preclassified"] = len(rows) - len(pending)
+        if rows:
+            info(
+                "Pre-classified comments locally",
+                channel_id=channel_id,
+                count=stats["preclassified"],
+                total=len(rows),
+                fraction=round(stats["preclassified"] / len(rows), 3),
+            )
+
+    # Collapse copy-pasted and near-identical comments, only the first
+    # comment of each cluster is classified
+    clusters = cluster_comments(
+        {row["youtube_comment_id"]: row["text_original"] for row in pending},
+        max_distance=current_app.config.get("DEDUP_MAX_DISTANCE", 3),
+    )
+    representative_of = {
+        comment_id: cluster[0] for cluster in clusters for comment_id in cluster
+    }
+    texts = {row["youtube_comment_id"]: row["text_original"] for row in pending}
+    representatives = [cluster[0] for cluster in clusters]
+    stats["duplicates"] = len(texts) - len(clusters)
+    cluster_sizes = sorted((len(c) for c in clusters if len(c) > 1), reverse=True)
+    if cluster_sizes:
+        info(
+            "Clustered near-duplicate comments",
+            channel_id=channel_id,
+            clusters=len(clusters),
+            duplicates=stats["duplicates"],
+            largest_cluster_sizes=cluster_sizes[:10],
+        )
+
+    cache = ClassificationCache()
+    cache_keys = {
+        comment_id: cache.key_for(texts[comment_id]) for comment_id in representatives
+    }
+    cached = cache.get_many(cache_keys.values())
+    uncached = {
+        comment_id: texts[comment_id]
+        for comment_id in representatives
+        if cache_keys[comment_id] not in cached
+    }
+
+    classify_started = time.monotonic()
+    if deadline is None:
+        fresh = ai_service.classify_comments(uncached, default=None)
+    elif deadline > classify_started:
+        fresh = ai_service.classify_comments(
+            uncached, default=None, deadline=deadline - classify_started
+        )
+    else:
+        # Out of time: no requests at all, the rows get the default category
+        if uncached:
+            warning(
+                "Classification deadline passed, skipping Gemini",
+                channel_id=channel_id,
+                count=len(uncached),
+            )
+        fresh = {comment_id: None for comment_id in uncached}
+    classify_latency = time.monotonic() - classify_started
+    if uncached:
+        info(
+            "Classified comments with Gemini",
+            channel_id=channel_id,
+            count=len(uncached),
+            latency=f"{classify_latency:.3f}s",
+            per_item_latency=f"{classify_latency / len(uncached):.3f}s",
+            gemini_client=ai_service.client.stats(),
+        )
+    # Failed classifications are not cached, their rows are flagged instead
+    # and reclassify_pending_comments retries them in a later sync
+    cache.set_many(
+        {
+            cache_keys[comment_id]: category
+            for comment_id, category in fresh.items()
+            if category is not None
+        }
+    )
+
+    stats["cache_misses"] = len(uncached)
+    stats["cache_hits"] = len(representatives) - len(uncached)
+    for row in pending:
+        representative = representative_of[row["youtube_comment_id"]]
+        if representative in uncached:
+            row["category"] = fresh[representative] or DEFAULT_CATEGORY
+            row["needs_classification"] = fresh[representative] is None
         else:
-            # Create new comment object
-            new_comment = Comment(
-                youtube_comment_id=comment_id_yt,
-                channel_id=channel.id,
-                text_original=top_level_comment["textOriginal"],
-                author_name=top_level_comment["authorDisplayName"],
-                author_avatar_url=top_level_comment["authorProfileImageUrl"],
-                video_id=top_level_comment["videoId"],
-                published_at=isoparse(top_level_comment["publishedAt"]),
-                category=category,
+            row["category"] = cached[cache_keys[representative]]
+
+    return stats
+
+
+def reclassify_pending_comments(channel_id, ai_service, deadline):
+    """
+    Classify again up to SYNC_BATCH_SIZE of the channel's comments flagged
+    needs_classification, newest first, and save the categories. Nothing is
+    sent once the sync's classification deadline has passed.
+
+    Returns:
+        int: How many of them have a real classification now
+    """
+    if time.monotonic() >= deadline:
+        return 0
+    rows = [
+        row._asdict()
+        for row in db.session.execute(
+            select(
+                Comment.youtube_comment_id,
+                Comment.channel_id,
+                Comment.text_original,
+                Comment.author_name,
+                Comment.author_avatar_url,
+                Comment.video_id,
+                Comment.published_at,
             )
-            db.session.add(new_comment)
-            new_comment_count += 1
+            .where(Comment.channel_id == channel_id, Comment.needs_classification)
+            .order_by(Comment.published_at.desc())
+            .limit(current_app.config.get("SYNC_BATCH_SIZE", 200))
+        )
+    ]
+    if not rows:
+        return 0
+
+    classify_rows(rows, ai_service, channel_id, deadline=deadline)
+    upsert_comments(rows)
+    reclassified = sum(not row["needs_classification"] for row in rows)
+    info(
+        "Reclassified comments",
+        channel_id=channel_id,
+        reclassified=reclassified,
+        pending=len(rows),
+    )
+    return reclassified
+
+
+def _comment_row(item, channel_id):
+    """Flatten a commentThreads item into a row for the comments table."""
+    top_level_comment = item["snippet"]["topLevelComment"]["snippet"]
+    comment_id_yt = item["snippet"]["topLevelComment"]["id"]
+    return {
+        "youtube_comment_id": comment_id_yt,
+        "channel_id": channel_id,
+        "text_original": top_level_comment["textOriginal"],
+        "author_name": top_level_comment["authorDisplayName"],
+        "author_avatar_url": top_level_comment["authorProfileImageUrl"],
+        "video_id": top_level_comment["videoId"],
+        "published_at": isoparse(top_level_comment["publishedAt"]),
+    }
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def upsert_comments(rows):
+    """
+    Insert new comments and update the text and category of existing ones, using one
+    lookup query and batched INSERT/UPDATE statements per batch of rows.
+
+    A sync and a backfill of the same channel can save the same comments at
+    the same time. New comments are inserted with ON CONFLICT DO NOTHING, so
+    one the other writer committed in the meantime is skipped rather than
+    failing the batch, and only rows this call actually inserted are counted.
+    Existing comments are locked (SELECT ... FOR UPDATE on PostgreSQL) while
+    they are read, so the category a count is moved away from is the one
+    actually stored, and the locks are held until the commit at the end.
+
+    Returns:
+        tuple: (added count, updated count)
+    """
+    batch_size = current_app.config.get("DB_WRITE_BATCH_SIZE", 500)
+
+    # The same comment can show up twice in one fetch, keep the last copy.
+    # Rows are locked and inserted in key order, so concurrent writers wait
+    # on each other instead of deadlocking.
+    rows = sorted(
+        {row["youtube_comment_id"]: row for row in rows}.values(),
+        key=lambda row: row["youtube_comment_id"],
+    )
+
+    added = 0
+    updated = 0
+    count_deltas = Counter()
+    # (channel_id, video_id, category) -> count delta / newest publish time
+    video_deltas = Counter()
+    video_latest = {}
+
+    def count_video_comment(row, category, delta):
+        if row["video_id"] is None:
+            return
+        key = (row["channel_id"], row["video_id"], category)
+        video_deltas[key] += delta
+        if delta > 0 and row["published_at"] is not None:
+            latest = video_latest.get(key)
+            if latest is None or row["published_at"] > latest:
+                video_latest[key] = row["published_at"]
 
-    if new_comment_count > 0 or updated_comment_count > 0:
+    for batch in _batches(rows, batch_size):
+        existing = {
+            comment.youtube_comment_id: comment
+            for comment in db.session.execute(
+                select(
+                    Comment.id,
+                    Comment.youtube_comment_id,
+                    Comment.text_original,
+                    Comment.category,
+                    Comment.needs_classification,
+                )
+                .where(
+                    Comment.youtube_comment_id.in_(
+                        [row["youtube_comment_id"] for row in batch]
+                    )
+                )
+                .order_by(Comment.youtube_comment_id)
+                .with_for_update()
+            )
+        }
+
+        new_rows = []
+        changed_rows = []
+        for row in batch:
+            if row["youtube_comment_id"] not in existing:
+                new_rows.append(row)
+                continue
+            stored = existing[row["youtube_comment_id"]]
+            category = stored.category
+            needs_classification = row.get("needs_classification", False)
+            if needs_classification and stored.text_original == row["text_original"]:
+                # Not classified this time, whatever is stored is at least as good
+                continue
+            # Comments can be edited on YouTube, keep text and category in step
+            if (
+                stored.text_original,
+                category,
+                stored.needs_classification,
+            ) != (row["text_original"], row["category"], needs_classification):
+                changed_rows.append(
+                    {
+                        "id": stored.id,
+                        "text_original": row["text_original"],
+                        "category": row["category"],
+                        "needs_classification": needs_classification,
+                    }
+                )
+                count_deltas[row["channel_id"], category] -= 1
+                count_deltas[row["channel_id"], row["category"]] += 1
+                if category != row["category"]:
+                    count_video_comment(row, category, -1)
+                    count_video_comment(row, row["category"], 1)
+
+        if new_rows:
+            inserted = set(
+                db.session.scalars(
+                    dialect_insert(Comment)
+                    .on_conflict_do_nothing(index_elements=["youtube_comment_id"])
+                    .returning(Comment.youtube_comment_id),
+                    new_rows,
+                )
+            )
+            for row in new_rows:
+                if row["youtube_comment_id"] in inserted:
+                    count_deltas[row["channel_id"], row["category"]] += 1
+                    count_video_comment(row, row["category"], 1)
+            added += len(inserted)
+        if changed_rows:
+            # Bulk UPDATE by primary key, executed as a single executemany
+            db.session.execute(update(Comment), changed_rows)
+        updated += len(changed_rows)
+
+    if added or updated:
+        _apply_category_counts(count_deltas)
+        _apply_video_counts(video_deltas, video_latest)
+        db.session.commit()
+        # Only after the commit, so a page cached under the new version
+        # can never miss these rows
+        for channel_id in {row["channel_id"] for row in rows}:
+            bump_data_version(channel_id)
+    else:
+        # Nothing to save, but the row locks still have to be released
         db.session.commit()
 
-    return f"Processed {len(comments_from_api)} comments. Added {new_comment_count} new comments, updated {updated_comment_count} existing comments."
+    return added, updated
+
+
+def _apply_category_counts(deltas):
+    """
+    Add per-(channel, category) deltas to channel_category_counts in one
+    statement. Increments are done by the database, so concurrent writers
+    (a sync and a backfill of the same channel) cannot lose updates; the
+    deltas themselves are only right because upsert_comments computes them
+    from rows it holds locked. Rows are written in key order, so two writers
+    lock them in the same order and cannot deadlock each other.
+    """
+    rows = [
+        {"channel_id": channel_id, "category": category, "count": delta}
+        for (channel_id, category), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(ChannelCategoryCount)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["channel_id", "category"],
+            set_={"count": ChannelCategoryCount.count + stmt.excluded.count},
+        ),
+        rows,
+    )
+
+
+def _apply_video_counts(deltas, latest):
+    """
+    Add per-(channel, video, category) deltas to video_category_counts in one
+    statement, moving latest_published_at forward where `latest` is newer.
+    Rows are written in key order, like in _apply_category_counts.
+    """
+    rows = [
+        {
+            "channel_id": channel_id,
+            "video_id": video_id,
+            "category": category,
+            "count": delta,
+            "latest_published_at": latest.get((channel_id, video_id, category)),
+        }
+        for (channel_id, video_id, category), delta in sorted(deltas.items())
+        # A zero delta can still carry a newer comment (one in, one moved out)
+        if delta or (channel_id, video_id, category) in latest
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(VideoCategoryCount)
+    newest = stmt.excluded.latest_published_at
+    current = VideoCategoryCount.latest_published_at
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["channel_id", "video_id", "category"],
+            set_={
+                "count": VideoCategoryCount.count + stmt.excluded.count,
+                # A NULL on either side compares as unknown and keeps the other
+                "latest_published_at": case(
+                    (newest > current, newest), else_=func.coalesce(current, newest)
+                ),
+            },
+        ),
+        rows,
+    )
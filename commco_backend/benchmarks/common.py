@@ -0,0 +1,94 @@
+"""
+Shared setup for the benchmarks: an app bound to a scratch database, a
+seeded user and channel, and a counter of database round-trips.
+"""
+
+import os
+import tempfile
+import threading
+
+from cryptography.fernet import Fernet
+from sqlalchemy import event
+
+
+def default_database_url():
+    """A throwaway SQLite file, used when no --database-url is given."""
+    handle, path = tempfile.mkstemp(prefix="commco-bench-", suffix=".sqlite")
+    os.close(handle)
+    return f"sqlite:///{path}"
+
+
+def create_benchmark_app(database_url, **overrides):
+    """
+    Build the Flask app against `database_url`, which is dropped and
+    recreated by reset_database(), so never point it at real data.
+    Settings the app requires at import time get harmless defaults.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+    from app import create_app
+    from config import Config
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        # Tasks are run eagerly in-process, nothing goes through a broker
+        CELERY_BROKER_URL = "memory://"
+        CELERY_RESULT_BACKEND = "cache+memory://"
+
+    for name, value in overrides.items():
+        setattr(BenchmarkConfig, name, value)
+
+    return create_app(BenchmarkConfig)
+
+
+def reset_database():
+    """Drop and recreate every table of the app's database."""
+    from app.extensions import db
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def create_channel(youtube_channel_id="UC-benchmark"):
+    """A user with stored (fake) tokens and one linked channel. Returns the channel."""
+    from app.extensions import db
+    from app.models import Channel, User
+    from app.services import encrypt_data
+
+    user = User(
+        google_id="benchmark-user",
+        email="benchmark@example.com",
+        access_token_encrypted=encrypt_data("benchmark-access-token"),
+        refresh_token_encrypted=encrypt_data("benchmark-refresh-token"),
+    )
+    db.session.add(user)
+    db.session.flush()
+    channel = Channel(youtube_channel_id=youtube_channel_id, user_id=user.id)
+    db.session.add(channel)
+    db.session.commit()
+    return channel
+
+
+class QueryCounter:
+    """Counts statements sent to the database, executemany counting once."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _before_cursor_execute(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
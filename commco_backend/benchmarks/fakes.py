@@ -0,0 +1,211 @@
+"""
+Local stand-ins for the YouTube Data API and Gemini, used by the benchmarks.
+
+Both fakes sit at the transport layer, so the real googleapiclient request
+building, the real GeminiClient (retries, rate limiting, connection pool) and
+the real response parsing all run; only the network is replaced.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+import requests
+from requests.adapters import BaseAdapter
+
+# Comment texts in roughly the mix a popular channel gets: mostly unique
+# sentences, plus questions, link spam, emoji-only replies and copy-paste
+# duplicates, so the pre-classifier and near-duplicate paths are exercised too.
+QUESTION_TEMPLATES = [
+    "How did you edit the part at {minute}:{second:02d}? Which software was it?",
+    "What camera do you use for the {topic} shots?",
+    "Can you do a video about {topic} next?",
+]
+STATEMENT_TEMPLATES = [
+    "I have been watching since the {topic} series and this is the best one yet",
+    "The {topic} section really helped me, thanks for explaining it so clearly",
+    "Honestly the {topic} part felt rushed compared to the rest of the video",
+    "You should try combining {topic} with {other} in a future episode",
+    "Not sure I agree about {topic}, in my experience {other} works better",
+]
+SPAM_TEMPLATES = [
+    "Check out my channel for free {topic} giveaways https://example.com/{n}",
+    "Earn $500 a day from home with crypto, message me on telegram @invest{n}",
+]
+EMOJI_ONLY = ["🔥🔥🔥", "😂😂", "❤️", "👏👏👏👏", "💯"]
+DUPLICATES = ["first", "Who is watching in 2025?", "great video as always!!"]
+TOPICS = [
+    "lighting",
+    "color grading",
+    "sound design",
+    "thumbnail",
+    "pacing",
+    "storytelling",
+    "b-roll",
+    "interview",
+    "travel",
+    "budget",
+]
+
+
+def comment_text(rng, n):
+    """One generated comment text, deterministic for a seeded rng."""
+    roll = rng.random()
+    topic, other = rng.sample(TOPICS, 2)
+    if roll < 0.45:
+        template = rng.choice(STATEMENT_TEMPLATES)
+        # A serial number keeps most statements distinct from each other
+        return f"{template.format(topic=topic, other=other)} #{n}"
+    if roll < 0.70:
+        return rng.choice(QUESTION_TEMPLATES).format(
+            topic=topic, minute=rng.randint(0, 20), second=rng.randint(0, 59)
+        )
+    if roll < 0.80:
+        return rng.choice(SPAM_TEMPLATES).format(topic=topic, n=n)
+    if roll < 0.88:
+        return rng.choice(EMOJI_ONLY)
+    return rng.choice(DUPLICATES)
+
+
+def comment_thread(n, text, published_at):
+    """A commentThreads item in the shape the YouTube Data API returns."""
+    return {
+        "kind": "youtube#commentThread",
+        "id": f"thread-{n}",
+        "snippet": {
+            "videoId": f"video-{n % 50}",
+            "topLevelComment": {
+                "kind": "youtube#comment",
+                "id": f"comment-{n}",
+                "snippet": {
+                    "videoId": f"video-{n % 50}",
+                    "textOriginal": text,
+                    "authorDisplayName": f"Viewer {n % 997}",
+                    "authorProfileImageUrl": f"https://example.com/avatar/{n % 997}.jpg",
+                    "publishedAt": published_at.isoformat().replace("+00:00", "Z"),
+                },
+            },
+        },
+    }
+
+
+class FakeYouTubeHttp:
+    """
+    httplib2.Http replacement serving `total` generated comment threads,
+    newest first, in pages of at most `page_size` after `latency` seconds each.
+    """
+
+    def __init__(self, total, page_size=100, latency=0.0, seed=0, newest=None):
+        self.total = total
+        self.page_size = page_size
+        self.latency = latency
+        self.seed = seed
+        self.newest = newest or datetime.now(timezone.utc).replace(microsecond=0)
+        self.timeout = None
+        self.redirect_codes = set()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _item(self, n):
+        # Seeding per comment keeps every page reproducible on its own
+        rng = random.Random(f"{self.seed}:{n}")
+        return comment_thread(
+            n, comment_text(rng, n), self.newest - timedelta(seconds=30 * n)
+        )
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        query = parse_qs(urlparse(uri).query)
+        start = int(query.get("pageToken", ["0"])[0])
+        size = min(self.page_size, int(query.get("maxResults", ["20"])[0]))
+        end = min(self.total, start + size)
+
+        payload = {
+            "kind": "youtube#commentThreadListResponse",
+            "items": [self._item(n) for n in range(start, end)],
+        }
+        if end < self.total:
+            payload["nextPageToken"] = str(end)
+
+        response = httplib2.Response(
+            {"status": "200", "content-type": "application/json; charset=UTF-8"}
+        )
+        return response, json.dumps(payload).encode("utf-8")
+
+    def close(self):
+        pass
+
+
+NUMBERED_LINE_RE = re.compile(r"^(\d+): (.*)$", re.MULTILINE)
+
+
+class FakeGeminiAdapter(BaseAdapter):
+    """
+    requests transport adapter answering generateContent calls like Gemini:
+    a JSON category for single-comment prompts, a number->category object for
+    batch prompts, picked from `categories`. Each call takes `latency` seconds
+    and fails with a 503 at `error_rate`.
+    """
+
+    def __init__(self, categories, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__()
+        self.categories = categories
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if failed:
+            return self._response(request, 503, {"error": {"code": 503}})
+
+        prompt = json.loads(request.body)["contents"][0]["parts"][0]["text"]
+        numbered = NUMBERED_LINE_RE.findall(prompt)
+        if numbered:
+            answer = {number: self._category(text) for number, text in numbered}
+        else:
+            answer = {"category": self._category(prompt)}
+        body = {
+            "candidates": [
+                {"content": {"parts": [{"text": json.dumps(answer)}], "role": "model"}}
+            ]
+        }
+        return self._response(request, 200, body)
+
+    def _category(self, text):
+        # Derived from the text so duplicates always get the same answer
+        digest = hashlib.md5(text.encode("utf-8")).digest()
+        return self.categories[digest[0] % len(self.categories)]
+
+    def _response(self, request, status_code, body):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,289 @@
+"""
+Read-path benchmark for GET /api/comments.
+
+Seeds a comments table of realistic size (millions of rows across many
+channels of very different sizes, skewed categories) and drives the Flask
+app through its test client, so login_required, the route, serialization and
+the database all take part. For the largest channel and a median one it
+reports, per category filter and page depth:
+
+- p50/p95/p99 latency in milliseconds
+- queries per request
+- throughput in requests per second
+
+Pages past the first are reached by following the response's `next_cursor`;
+when the API does not return one only the first page is measured.
+
+The listing cache is off unless --cache is given: the timed requests repeat
+the same GET, and with the cache on every one after the warm-up would be a
+Redis lookup instead of a database query.
+
+The seeded database is reused on later runs (seeding only happens when the
+comments table is empty, or with --reseed), so the same data can be measured
+before and after a schema or index change.
+
+Usage (from commco_backend/):
+    python -m benchmarks.read_path --database-url sqlite:////tmp/commco-read.sqlite
+    python -m benchmarks.read_path --rows 5000000 --channels 500 --database-url postgresql+psycopg://localhost/commco_bench
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from .common import QueryCounter, create_benchmark_app, default_database_url
+from .fakes import comment_text
+
+SEED_BATCH_SIZE = 10000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--database-url",
+        help="scratch database, reused between runs (default: a temporary SQLite file)",
+    )
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument(
+        "--reseed", action="store_true", help="drop and seed the tables again"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="timed requests per case"
+    )
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3, help="page depths to measure")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="clients sending requests at once, for the throughput figure",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep the listing cache on, to measure cached responses",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def channel_sizes(rows, channels):
+    """Split `rows` over `channels` with a Zipf-like skew, largest first."""
+    weights = [1 / rank for rank in range(1, channels + 1)]
+    total = sum(weights)
+    sizes = [int(rows * weight / total) for weight in weights]
+    sizes[0] += rows - sum(sizes)
+    return sizes
+
+
+def seed(args):
+    """Create the tables if needed and fill them with generated comments."""
+    from app.extensions import db
+    from app.models import Channel, Comment, User
+    from app.services import CATEGORIES, encrypt_data
+    from sqlalchemy import insert
+
+    if args.reseed:
+        db.drop_all()
+    db.create_all()
+    if db.session.query(Comment.id).limit(1).first() is not None:
+        return
+
+    rng = random.Random(args.seed)
+    # Most comments are fans and questions, few are ideas or criticism
+    category_weights = [30, 25, 8, 7, 10, 20][: len(CATEGORIES)]
+    newest = datetime.now(timezone.utc)
+    token = encrypt_data("benchmark-access-token")
+
+    started = time.perf_counter()
+    serial = 0
+    for number, size in enumerate(channel_sizes(args.rows, args.channels)):
+        user = User(
+            google_id=f"benchmark-user-{number}",
+            email=f"benchmark-{number}@example.com",
+            access_token_encrypted=token,
+        )
+        db.session.add(user)
+        db.session.flush()
+        channel = Channel(youtube_channel_id=f"UC-benchmark-{number}", user_id=user.id)
+        db.session.add(channel)
+        db.session.flush()
+
+        for offset in range(0, size, SEED_BATCH_SIZE):
+            rows = []
+            for _ in range(min(SEED_BATCH_SIZE, size - offset)):
+                serial += 1
+                rows.append(
+                    {
+                        "youtube_comment_id": f"comment-{serial}",
+                        "channel_id": channel.id,
+                        "text_original": comment_text(rng, serial),
+                        "author_name": f"Viewer {serial % 997}",
+                        "author_avatar_url": f"https://example.com/avatar/{serial % 997}.jpg",
+                        "video_id": f"video-{number}-{rng.randrange(200)}",
+                        "published_at": newest
+                        - timedelta(seconds=rng.randrange(2 * 365 * 86400)),
+                        "category": rng.choices(CATEGORIES, category_weights)[0],
+                    }
+                )
+            db.session.execute(insert(Comment), rows)
+            db.session.commit()
+    print(f"Seeded {serial} comments in {time.perf_counter() - started:.0f}s")
+
+
+def benchmark_channels():
+    """The largest channel and a median-sized one, as (label, user_id)."""
+    from app.extensions import db
+    from app.models import Channel, Comment
+    from sqlalchemy import func
+
+    counts = (
+        db.session.query(Channel.user_id, func.count(Comment.id))
+        .join(Comment, Comment.channel_id == Channel.id)
+        .group_by(Channel.user_id)
+        .order_by(func.count(Comment.id).desc())
+        .all()
+    )
+    largest, median = counts[0], counts[len(counts) // 2]
+    return [
+        (f"largest ({largest[1]} comments)", largest[0]),
+        (f"median ({median[1]} comments)", median[0]),
+    ]
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    # Let the app fill in the rest of the session, like a real login does
+    client.get("/api/user/me")
+
+
+def _page(body):
+    """Comments and next cursor from either response shape of the endpoint."""
+    if isinstance(body, list):
+        return body, None
+    return body.get("comments", []), body.get("next_cursor")
+
+
+def page_params(client, category, pages):
+    """Query strings reaching pages 1..pages, fewer if the results run out."""
+    params = [{"category": category}]
+    while len(params) < pages:
+        response = client.get("/api/comments", query_string=params[-1])
+        items, cursor = _page(response.get_json())
+        if not items or not cursor:
+            break
+        params.append({"category": category, "cursor": cursor})
+    return params
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(app, user_id, params, args, query_counter):
+    """Time `args.requests` identical requests and count their queries."""
+
+    # Requests are sent from fresh threads: create_app() pushes an app context
+    # in the main thread, and requests made there would share its database
+    # session (and the objects it already loaded) instead of starting clean
+    # like a server's requests do.
+    def worker(count):
+        client = app.test_client()
+        login(client, user_id)
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get("/api/comments", query_string=params)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def counted_request():
+        client = app.test_client()
+        login(client, user_id)
+        with query_counter:
+            response = client.get("/api/comments", query_string=params)
+        return response, query_counter.count
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(worker, args.warmup).result()
+        response, queries = pool.submit(counted_request).result()
+    if response.status_code != 200:
+        raise RuntimeError(f"GET /api/comments returned {response.status_code}")
+
+    per_worker = max(1, args.requests // args.concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        runs = list(pool.map(worker, [per_worker] * args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for run in runs for latency in run)
+    return {
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "queries": queries,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "returned": len(_page(response.get_json())[0]),
+    }
+
+
+def print_table(results):
+    columns = [
+        ("channel", "channel", 28),
+        ("category", "category", 18),
+        ("page", "page", 5),
+        ("returned", "rows", 5),
+        ("p50_ms", "p50 ms", 9),
+        ("p95_ms", "p95 ms", 9),
+        ("p99_ms", "p99 ms", 9),
+        ("queries", "queries", 8),
+        ("requests_per_sec", "req/s", 9),
+    ]
+    print("  ".join(f"{title:>{width}}" for _, title, width in columns))
+    for result in results:
+        print("  ".join(f"{str(result[key]):>{width}}" for key, _, width in columns))
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or default_database_url()
+    app = create_benchmark_app(database_url, LISTING_CACHE_ENABLED=args.cache)
+
+    from app.extensions import db
+    from app.services import CATEGORIES
+
+    print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+    with app.app_context():
+        seed(args)
+        targets = benchmark_channels()
+
+    query_counter = QueryCounter(db.engine)
+    results = []
+    for label, user_id in targets:
+        client = app.test_client()
+        login(client, user_id)
+        for category in CATEGORIES + ["All"]:
+            for page, params in enumerate(
+                page_params(client, category, args.pages), start=1
+            ):
+                result = measure(app, user_id, params, args, query_counter)
+                result.update(channel=label, category=category, page=page)
+                results.append(result)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
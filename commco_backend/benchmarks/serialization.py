@@ -0,0 +1,212 @@
+"""
+Listing serialization microbenchmark.
+
+Times turning one page of comments into a response body, the CPU work a web
+worker does for every uncached listing, at several page sizes:
+
+- entities/json: Comment entities, a dict per row with published_at.isoformat()
+  and the standard library encoder (how listings used to be built)
+- entities/orjson: the same entities and dicts, encoded by app.json_provider
+- columns/json: only the listed columns as plain rows, standard library encoder
+- columns/orjson: only the listed columns, encoded by app.json_provider (what
+  the listing routes do now)
+
+Each variant includes the query, so the cost of building ORM entities is part
+of the figure. It also reports the body size and what gzip at COMPRESS_LEVEL
+makes of it (see app/compression.py).
+
+Usage (from commco_backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --page-sizes 100,500,1000 --repeat 500
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from .common import (
+    create_benchmark_app,
+    create_channel,
+    default_database_url,
+    reset_database,
+)
+from .fakes import comment_text
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--database-url",
+        help="scratch database, dropped and recreated (default: a temporary SQLite file)",
+    )
+    parser.add_argument(
+        "--page-sizes",
+        default="100,500",
+        help="comma separated comments per page (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def seed(rows, rng):
+    from app.extensions import db
+    from app.models import Comment
+    from app.services import CATEGORIES
+    from sqlalchemy import insert
+
+    channel = create_channel()
+    newest = datetime.now(timezone.utc)
+    db.session.execute(
+        insert(Comment),
+        [
+            {
+                "youtube_comment_id": f"comment-{serial}",
+                "channel_id": channel.id,
+                "text_original": comment_text(rng, serial),
+                "author_name": f"Viewer {serial % 997}",
+                "author_avatar_url": f"https://example.com/avatar/{serial % 997}.jpg",
+                "video_id": f"video-{rng.randrange(50)}",
+                "published_at": newest - timedelta(seconds=rng.randrange(86400 * 365)),
+                "category": rng.choice(CATEGORIES),
+            }
+            for serial in range(rows)
+        ],
+    )
+    db.session.commit()
+    return channel.id
+
+
+def entity_page(channel_id, limit):
+    from app.models import Comment
+
+    comments = (
+        Comment.query.filter_by(channel_id=channel_id)
+        .order_by(Comment.published_at.desc(), Comment.id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": comment.id,
+            "youtube_comment_id": comment.youtube_comment_id,
+            "text_original": comment.text_original,
+            "author_name": comment.author_name,
+            "author_avatar_url": comment.author_avatar_url,
+            "video_id": comment.video_id,
+            "published_at": comment.published_at.isoformat(),
+            "category": comment.category,
+        }
+        for comment in comments
+    ]
+
+
+def column_page(channel_id, limit):
+    from app.models import Comment
+    from app.routes import _category_query, _comment_json
+
+    rows = (
+        _category_query(channel_id, "All")
+        .order_by(Comment.published_at.desc(), Comment.id)
+        .limit(limit)
+        .all()
+    )
+    return [_comment_json(row) for row in rows]
+
+
+def stdlib_body(app, payload):
+    # What jsonify produced with Flask's default provider; datetimes are
+    # written by the app provider's fallback, as without orjson
+    return json.dumps(
+        payload, default=app.json.default, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def provider_body(app, payload):
+    return app.json.response(payload).get_data()
+
+
+VARIANTS = [
+    ("entities/json", entity_page, stdlib_body),
+    ("entities/orjson", entity_page, provider_body),
+    ("columns/json", column_page, stdlib_body),
+    ("columns/orjson", column_page, provider_body),
+]
+
+
+def measure(app, channel_id, limit, build, encode, repeat):
+    from app.extensions import db
+
+    timings = []
+    for _ in range(repeat + 5):
+        # A new session per run, like a request gets
+        db.session.remove()
+        started = time.perf_counter()
+        body = encode(app, {"comments": build(channel_id, limit), "next_cursor": None})
+        timings.append(time.perf_counter() - started)
+    timings = sorted(timings[5:])
+    return body, {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))] * 1000, 3),
+    }
+
+
+def main():
+    args = parse_args()
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    app = create_benchmark_app(args.database_url or default_database_url())
+
+    from app.json_provider import orjson
+
+    if orjson is None:
+        print("orjson is not installed: the */orjson variants use the standard library")
+
+    reset_database()
+    channel_id = seed(max(page_sizes), random.Random(args.seed))
+    level = app.config["COMPRESS_LEVEL"]
+
+    results = []
+    for limit in page_sizes:
+        baseline = None
+        for name, build, encode in VARIANTS:
+            body, result = measure(app, channel_id, limit, build, encode, args.repeat)
+            started = time.perf_counter()
+            compressed = gzip.compress(body, compresslevel=level)
+            gzip_ms = (time.perf_counter() - started) * 1000
+            baseline = baseline or result["median_ms"]
+            result.update(
+                variant=name,
+                page_size=limit,
+                speedup=round(baseline / result["median_ms"], 2),
+                body_kb=round(len(body) / 1024, 1),
+                gzip_kb=round(len(compressed) / 1024, 1),
+                gzip_ms=round(gzip_ms, 3),
+            )
+            results.append(result)
+
+    columns = [
+        ("page_size", "rows", 5),
+        ("variant", "variant", 16),
+        ("median_ms", "median ms", 10),
+        ("p95_ms", "p95 ms", 9),
+        ("speedup", "speedup", 8),
+        ("body_kb", "body KB", 8),
+        ("gzip_kb", "gzip KB", 8),
+        ("gzip_ms", "gzip ms", 8),
+    ]
+    print("  ".join(f"{title:>{width}}" for _, title, width in columns))
+    for result in results:
+        print("  ".join(f"{str(result[key]):>{width}}" for key, _, width in columns))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Sync throughput benchmark.
+
+Runs the real process_channel_comments task against generated comments
+served by local YouTube and Gemini stand-ins (see benchmarks/fakes.py) and
+reports, per channel size:
+
+- comments/sec: comments saved per second of wall time
+- LLM calls/comment: Gemini requests (retries included) per comment
+- DB round-trips: statements sent to the database during the sync
+- peak memory: highest Python heap use during the sync (tracemalloc)
+
+Each size runs on a freshly recreated database, so every sync is a cold
+first sync of the whole channel. Redis is used for the sync lock and job
+status as in production; if REDIS_URL is unreachable the task still runs and
+only logs warnings.
+
+Usage (from commco_backend/):
+    python -m benchmarks.sync_throughput
+    python -m benchmarks.sync_throughput --sizes 1000 --gemini-latency 0.5
+    python -m benchmarks.sync_throughput --database-url postgresql+psycopg://localhost/commco_bench
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from unittest import mock
+
+from .common import (
+    QueryCounter,
+    create_benchmark_app,
+    create_channel,
+    default_database_url,
+    reset_database,
+)
+from .fakes import FakeGeminiAdapter, FakeYouTubeHttp
+
+GEMINI_URL_PREFIX = "https://generativelanguage.googleapis.com/"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="comma separated channel sizes in comments (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="scratch database, dropped and recreated (default: a temporary SQLite file)",
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument(
+        "--youtube-latency", type=float, default=0.05, help="seconds per page"
+    )
+    parser.add_argument(
+        "--gemini-latency", type=float, default=0.2, help="seconds per request"
+    )
+    parser.add_argument(
+        "--gemini-error-rate",
+        type=float,
+        default=0.01,
+        help="share of Gemini requests answered with a 503",
+    )
+    parser.add_argument(
+        "--gemini-rate-limit",
+        type=float,
+        help="Gemini requests per second (default: GEMINI_RATE_LIMIT)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip tracemalloc, which slows the sync down noticeably",
+    )
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def run_sync(size, args, query_counter):
+    """Sync a fresh channel of `size` comments and return its measurements."""
+    from app import services
+    from app.extensions import db
+    from app.gemini_client import get_gemini_client
+    from app.models import Comment
+    from app.tasks import process_channel_comments
+    from flask import current_app
+
+    reset_database()
+    channel = create_channel()
+    # Start every size cold, like a channel's first sync
+    services._classification_lru.clear()
+    services._credentials_cache.clear()
+
+    youtube = FakeYouTubeHttp(
+        size, page_size=args.page_size, latency=args.youtube_latency, seed=args.seed
+    )
+    gemini = FakeGeminiAdapter(
+        services.CATEGORIES,
+        latency=args.gemini_latency,
+        error_rate=args.gemini_error_rate,
+        seed=args.seed,
+    )
+    client = get_gemini_client(current_app.config)
+    client.session.mount(GEMINI_URL_PREFIX, gemini)
+
+    if not args.no_memory:
+        tracemalloc.start()
+    try:
+        with mock.patch.object(
+            services.httplib2, "Http", return_value=youtube
+        ), query_counter:
+            started = time.perf_counter()
+            message = process_channel_comments.apply(args=(channel.id,)).get()
+            elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if not args.no_memory else None
+    finally:
+        tracemalloc.stop()
+
+    saved = Comment.query.filter_by(channel_id=channel.id).count()
+    db.session.remove()
+    return {
+        "comments": size,
+        "saved": saved,
+        "seconds": round(elapsed, 2),
+        "comments_per_sec": round(saved / elapsed, 1) if elapsed else None,
+        "youtube_pages": youtube.requests,
+        "llm_calls": gemini.calls,
+        "llm_errors": gemini.errors,
+        "llm_calls_per_comment": round(gemini.calls / size, 4) if size else None,
+        "db_round_trips": query_counter.count,
+        "peak_memory_mb": round(peak / 2**20, 1) if peak is not None else None,
+        "message": message,
+    }
+
+
+def print_table(results):
+    columns = [
+        ("comments", "comments"),
+        ("seconds", "seconds"),
+        ("comments_per_sec", "comments/s"),
+        ("llm_calls", "LLM calls"),
+        ("llm_calls_per_comment", "LLM/comment"),
+        ("youtube_pages", "YT pages"),
+        ("db_round_trips", "DB trips"),
+        ("peak_memory_mb", "peak MB"),
+    ]
+    print("  ".join(f"{title:>12}" for _, title in columns))
+    for result in results:
+        print("  ".join(f"{str(result[key]):>12}" for key, _ in columns))
+
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    database_url = args.database_url or default_database_url()
+
+    overrides = {}
+    if args.gemini_rate_limit:
+        overrides["GEMINI_RATE_LIMIT"] = args.gemini_rate_limit
+    app = create_benchmark_app(database_url, **overrides)
+
+    from app.extensions import db
+
+    print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+    query_counter = QueryCounter(db.engine)
+    results = []
+    for size in sizes:
+        with app.app_context():
+            result = run_sync(size, args, query_counter)
+        if result["saved"] != size:
+            print(f"warning: {size} comments served but {result['saved']} saved")
+        print(f"{size} comments: {result['message']}")
+        results.append(result)
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,86 @@ class Config:
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_BROKER_URL")
 
+    # Seconds the Redis broker waits for a task to be acknowledged before giving
+    # it to another worker. Backfills are acknowledged late, so this should
+    # outlast them; a backfill redelivered while still running is skipped.
+    CELERY_VISIBILITY_TIMEOUT = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "43200"))
+
+    # Redis for sync locks (defaults to a local instance)
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Seconds a channel's sync lock survives if the worker holding it dies
+    SYNC_LOCK_TTL = int(os.getenv("SYNC_LOCK_TTL", "1800"))
+    # Seconds a sync event stream stays open before the client has to reconnect
+    SYNC_EVENTS_MAX_SECONDS = int(os.getenv("SYNC_EVENTS_MAX_SECONDS", "300"))
+
     # Custom App Config
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
     ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY").encode()  # Must be bytes
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+
+    # Local rules that classify obvious comments without calling Gemini
+    PRECLASSIFIER_ENABLED = os.getenv("PRECLASSIFIER_ENABLED", "true").lower() == "true"
+    PRECLASSIFIER_MIN_CONFIDENCE = float(
+        os.getenv("PRECLASSIFIER_MIN_CONFIDENCE", "0.85")
+    )
+
+    # SimHash bits two comments may differ in to share one classification (0: exact only)
+    DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+
+    # Batch classification: max comments and prompt characters per Gemini request
+    GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "25"))
+    GEMINI_BATCH_MAX_CHARS = int(os.getenv("GEMINI_BATCH_MAX_CHARS", "12000"))
+    # Concurrent Gemini requests per sync, and seconds a whole sync may spend
+    # waiting on Gemini before the rest of its comments get the default category
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+    GEMINI_CLASSIFY_DEADLINE = float(os.getenv("GEMINI_CLASSIFY_DEADLINE", "300"))
+    # Gemini HTTP client: timeouts in seconds, retries and requests per second
+    GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+    GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "60"))
+    GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+    GEMINI_RATE_LIMIT = float(os.getenv("GEMINI_RATE_LIMIT", "10"))
+
+    # Seconds the user and channel stored in the session are trusted before
+    # being checked against the database again (see identity.py)
+    SESSION_IDENTITY_TTL = int(os.getenv("SESSION_IDENTITY_TTL", "300"))
+
+    # Seconds a worker keeps a user's Google credentials when their expiry is unknown
+    CREDENTIALS_CACHE_TTL = int(os.getenv("CREDENTIALS_CACHE_TTL", "300"))
+
+    # Adaptive scheduled syncs (Celery beat): each channel is synced so that a sync
+    # finds about SYNC_TARGET_NEW_COMMENTS new comments, within these bounds
+    SYNC_TARGET_NEW_COMMENTS = int(os.getenv("SYNC_TARGET_NEW_COMMENTS", "20"))
+    SYNC_MIN_MINUTES = int(os.getenv("SYNC_MIN_MINUTES", "5"))
+    SYNC_MAX_MINUTES = int(os.getenv("SYNC_MAX_MINUTES", "1440"))
+    SYNC_RETRY_MINUTES = int(os.getenv("SYNC_RETRY_MINUTES", "60"))
+    SYNC_JITTER = float(os.getenv("SYNC_JITTER", "0.2"))
+    SYNC_DISPATCH_BATCH_SIZE = int(os.getenv("SYNC_DISPATCH_BATCH_SIZE", "100"))
+
+    # Comments classified, saved and committed together while streaming a sync
+    SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "200"))
+
+    # Full-history backfills: Celery queue they run on, and minutes without a
+    # checkpoint before a running job is considered stalled and resumed
+    BACKFILL_QUEUE = os.getenv("BACKFILL_QUEUE", "backfill")
+    BACKFILL_STALE_MINUTES = int(os.getenv("BACKFILL_STALE_MINUTES", "30"))
+
+    # Optional cap on commentThreads pages fetched per sync (0 means no cap). A
+    # capped sync leaves a resume point and the next one pages on from there.
+    SYNC_MAX_PAGES = int(os.getenv("SYNC_MAX_PAGES", "0")) or None
+
+    # Versioned cache and ETags for listings (see listing_cache.py), and seconds
+    # a cached page is kept
+    LISTING_CACHE_ENABLED = os.getenv("LISTING_CACHE_ENABLED", "true").lower() == "true"
+    LISTING_CACHE_TTL = int(os.getenv("LISTING_CACHE_TTL", "600"))
+
+    # Rows fetched from the database and written out per chunk of a comment export
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # JSON responses of at least COMPRESS_MIN_SIZE bytes are gzipped at this level
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+
+    # Rows per bulk INSERT/UPDATE statement when saving synced comments
+    DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "500"))
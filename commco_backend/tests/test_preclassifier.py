@@ -0,0 +1,50 @@
+import os
+import unittest
+
+# app/__init__ imports config, which needs an encryption key
+os.environ.setdefault("ENCRYPTION_KEY", "test")
+
+from app.preclassifier import RuleBasedClassifier  # noqa: E402
+
+# Comment text -> category the default rules settle it as, None when it has
+# to go to Gemini
+CASES = [
+    # Link spam
+    ("check out my channel https://youtu.be/x", "Delete Junk"),
+    ("https://bit.ly/abc", "Delete Junk"),
+    ("earn bitcoin fast, contact me on telegram https://t.me/x", "Delete Junk"),
+    ("I read about crypto the other day", None),
+    # Emoji-only praise
+    ("🔥🔥🔥", "Appreciate Fan"),
+    ("❤️ 👍🏽", "Appreciate Fan"),
+    ("❤️‍🔥", "Appreciate Fan"),
+    ("👎", None),
+    ("🤮", None),
+    ("💩", None),
+    ("☹", None),
+    ("©", None),
+    ("°", None),
+    ("^^", None),
+    ("🔥👎", None),
+    # Short questions
+    ("what mic do you use?", "Reply to Question"),
+    ("is this available in the EU?", "Reply to Question"),
+    ("why is the audio so bad?", None),
+    ("can you do a video on X?", None),
+    ("what about a part 2?", None),
+    ("why don't you upload anymore?", None),
+    ("what mic do you use?\nand which camera?", None),
+    ("great video", None),
+]
+
+
+class RuleBasedClassifierTest(unittest.TestCase):
+    def test_default_rules(self):
+        classifier = RuleBasedClassifier()
+        for text, expected in CASES:
+            with self.subTest(text=text):
+                self.assertEqual(classifier.classify(text), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
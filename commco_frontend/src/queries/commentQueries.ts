@@ -1,18 +1,54 @@
-import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query'
+import { useEffect, useRef } from 'react'
+import {
+  useInfiniteQuery,
+  useMutation,
+  useQuery,
+  useQueryClient,
+} from '@tanstack/react-query'
 import api from '../lib/axios'
-import type { Comment } from '../types/comment'
+import type {
+  CommentPage,
+  DashboardSnapshot,
+  SyncEvent,
+  SyncStartResponse,
+} from '../types/comment'
+
+// Query to fetch category counts and the first page of every category at once.
+// The pages are seeded into each category's comments query, so switching tabs
+// after the first paint needs no request.
+export const useDashboardQuery = () => {
+  const queryClient = useQueryClient()
 
-// Query to fetch comments for a specific category
-export const useCommentsQuery = (category: string) => {
   return useQuery({
+    queryKey: ['comments', 'dashboard'],
+    queryFn: async (): Promise<DashboardSnapshot> => {
+      const response = await api.get('/dashboard')
+      const snapshot: DashboardSnapshot = response.data
+      Object.entries(snapshot.pages).forEach(([category, page]) => {
+        queryClient.setQueryData(['comments', category], {
+          pages: [page],
+          pageParams: [null],
+        })
+      })
+      return snapshot
+    },
+    staleTime: 2 * 60 * 1000, // 2 minutes
+  })
+}
+
+// Query to fetch comments for a specific category, one page at a time
+export const useCommentsQuery = (category: string, enabled = true) => {
+  return useInfiniteQuery({
     queryKey: ['comments', category],
-    queryFn: async (): Promise<Array<Comment>> => {
+    queryFn: async ({ pageParam }): Promise<CommentPage> => {
       const response = await api.get('/comments', {
-        params: { category },
+        params: { category, cursor: pageParam ?? undefined },
       })
       return response.data
     },
-    enabled: !!category,
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    enabled: !!category && enabled,
     staleTime: 2 * 60 * 1000, // 2 minutes
   })
 }
@@ -22,17 +58,44 @@ export const useSyncChannelMutation = () => {
   const queryClient = useQueryClient()
 
   return useMutation({
-    mutationFn: async () => {
+    mutationFn: async (): Promise<SyncStartResponse> => {
       const response = await api.post('/channel/sync')
       return response.data
     },
-    onSuccess: () => {
-      // Invalidate all comments queries to refetch data
-      queryClient.invalidateQueries({ queryKey: ['comments'] })
-    },
   })
 }
 
+// Wait for a sync job to finish; comments are refetched once when it
+// completes instead of when it is merely queued. The event stream is only
+// open while there is a job to wait for (jobId is null otherwise), since
+// every open stream holds a server worker.
+export const useSyncEvents = (
+  jobId: string | null,
+  onEvent?: (event: SyncEvent) => void,
+) => {
+  const queryClient = useQueryClient()
+  const onEventRef = useRef(onEvent)
+  onEventRef.current = onEvent
+
+  useEffect(() => {
+    if (!jobId) return
+    const source = new EventSource(
+      `${api.defaults.baseURL}/channel/sync/events?job_id=${encodeURIComponent(jobId)}`,
+      { withCredentials: true },
+    )
+    source.addEventListener('sync', (message) => {
+      const event: SyncEvent = JSON.parse((message as MessageEvent).data)
+      // The job is over, do not let EventSource reconnect
+      source.close()
+      if (event.status === 'completed') {
+        queryClient.invalidateQueries({ queryKey: ['comments'] })
+      }
+      onEventRef.current?.(event)
+    })
+    return () => source.close()
+  }, [jobId, queryClient])
+}
+
 // Mutation to reply to a comment
 export const useReplyToCommentMutation = () => {
   const queryClient = useQueryClient()
@@ -2,8 +2,10 @@ import { useState } from 'react'
 import { createFileRoute, useSearch } from '@tanstack/react-router'
 import {
   useCommentsQuery,
+  useDashboardQuery,
   useReplyToCommentMutation,
   useSyncChannelMutation,
+  useSyncEvents,
 } from '../../queries/commentQueries'
 import { Button } from '../../components/ui/button'
 import { Tabs, TabsList, TabsTrigger } from '../../components/ui/tabs'
@@ -35,7 +37,20 @@ export const Route = createFileRoute('/dashboard/comments')({
 function CommentsPage() {
   const search = useSearch({ from: '/dashboard/comments' })
   const category = search.category || 'Reply to Question'
-  const { data, isLoading, isError, error } = useCommentsQuery(category)
+  // The dashboard snapshot fills the first page of every tab, so the tab's
+  // own query only starts once it is in (or failed)
+  const dashboardQuery = useDashboardQuery()
+  const counts = dashboardQuery.data?.counts
+  const {
+    data,
+    isLoading,
+    isError,
+    error,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useCommentsQuery(category, !dashboardQuery.isPending)
+  const comments = data?.pages.flatMap((page) => page.comments) ?? []
   const syncMutation = useSyncChannelMutation()
   const replyMutation = useReplyToCommentMutation()
   const [showToast, setShowToast] = useState(false)
@@ -43,6 +58,8 @@ function CommentsPage() {
   const [toastType, setToastType] = useState<'success' | 'error'>('success')
   const [replyingTo, setReplyingTo] = useState<number | null>(null)
   const [replyTexts, setReplyTexts] = useState<Record<number, string>>({})
+  // Sync started from this page that has not finished yet
+  const [syncJobId, setSyncJobId] = useState<string | null>(null)
 
   const showToastMessage = (
     message: string,
@@ -54,10 +71,25 @@ function CommentsPage() {
     setTimeout(() => setShowToast(false), 3000)
   }
 
+  useSyncEvents(syncJobId, (event) => {
+    if (event.status === 'skipped' && event.running_job_id) {
+      // Another sync of the channel was already running, wait for that one
+      setSyncJobId(event.running_job_id)
+      return
+    }
+    setSyncJobId(null)
+    if (event.status === 'completed') {
+      showToastMessage(`Sync complete: ${event.added ?? 0} new comments.`)
+    } else {
+      showToastMessage('Failed to sync comments. Please try again.', 'error')
+    }
+  })
+
   const handleSync = async () => {
     try {
-      await syncMutation.mutateAsync()
-      showToastMessage('Comments have been refreshed.')
+      const { job_id } = await syncMutation.mutateAsync()
+      setSyncJobId(job_id)
+      showToastMessage('Sync started. Comments will refresh when it finishes.')
     } catch (error) {
       showToastMessage('Failed to sync comments. Please try again.', 'error')
     }
@@ -130,6 +162,7 @@ function CommentsPage() {
                   className={category === cat ? 'font-bold' : ''}
                 >
                   {cat}
+                  {counts && ` (${counts[cat] ?? 0})`}
                 </a>
               </TabsTrigger>
             ))}
@@ -155,7 +188,7 @@ function CommentsPage() {
       )}
 
       <div className="mt-6">
-        {isLoading ? (
+        {isLoading || dashboardQuery.isPending ? (
           <div className="space-y-4">
             {[...Array(5)].map((_, i) => (
               <Skeleton key={i} className="h-24 w-full" />
@@ -172,8 +205,8 @@ function CommentsPage() {
           </Alert>
         ) : (
           <div className="space-y-4">
-            {data && data.length > 0 ? (
-              data.map((comment) => (
+            {comments.length > 0 ? (
+              comments.map((comment) => (
                 <div
                   key={comment.id}
                   className="border rounded-lg p-4 bg-white shadow"
@@ -291,6 +324,17 @@ function CommentsPage() {
                 No comments found for this category.
               </div>
             )}
+            {hasNextPage && (
+              <div className="flex justify-center">
+                <Button
+                  variant="outline"
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                >
+                  {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
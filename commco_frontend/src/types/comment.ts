@@ -8,3 +8,28 @@ export interface Comment {
   published_at: string
   category: string
 }
+
+export interface CommentPage {
+  comments: Array<Comment>
+  next_cursor: string | null
+}
+
+export interface DashboardSnapshot {
+  counts: Record<string, number>
+  pages: Record<string, CommentPage>
+}
+
+export interface SyncStartResponse {
+  message: string
+  job_id: string
+}
+
+export interface SyncEvent {
+  status: 'completed' | 'failed' | 'skipped'
+  job_id: string
+  added?: number
+  updated?: number
+  message?: string
+  // Set when skipped: the sync already running for the channel
+  running_job_id?: string
+}